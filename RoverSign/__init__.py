@@ -1,5 +1,6 @@
 """init"""
 
+import time
 import asyncio
 
 from gsuid_core.sv import Plugins
@@ -22,29 +23,48 @@ try:
     logger.info("[库洛签到·插件] bot_send_hook 导入成功")
 
     # ===== 活跃度批量写入缓冲 =====
-    _activity_buffer: dict[str, tuple[str, str, str]] = {}
+    # (user_id, bot_id, bot_self_id) -> 最后活跃时间
+    _activity_buffer: dict[tuple[str, str, str], int] = {}
     _FLUSH_INTERVAL = 60
+    _MAX_BUFFER_SIZE = 5000  # 缓冲区上限，达到后立即触发刷写
+    _flush_stats = {"flushes": 0, "rows": 0, "total_ms": 0.0, "last_ms": 0.0}
 
     async def _flush_activity_buffer():
         if not _activity_buffer:
             return
         pending = dict(_activity_buffer)
         _activity_buffer.clear()
-        for key, (user_id, bot_id, bot_self_id) in pending.items():
-            try:
-                await RoverUserActivity.update_user_activity(user_id, bot_id, bot_self_id)
-            except Exception as e:
-                logger.warning(f"[库洛签到·插件] 批量活跃度写入失败: {e}")
+        start = time.perf_counter()
+        try:
+            written = await RoverUserActivity.bulk_update_user_activity(
+                [(*key, active_time) for key, active_time in pending.items()]
+            )
+        except Exception as e:
+            logger.warning(f"[库洛签到·插件] 批量活跃度写入失败: {e}")
+            # 放回缓冲区等待下次刷写（期间的新记录优先），超过上限则丢弃
+            if len(_activity_buffer) + len(pending) <= _MAX_BUFFER_SIZE:
+                for key, active_time in pending.items():
+                    _activity_buffer.setdefault(key, active_time)
+            return
+        cost_ms = (time.perf_counter() - start) * 1000
+        _flush_stats["flushes"] += 1
+        _flush_stats["rows"] += written
+        _flush_stats["total_ms"] += cost_ms
+        _flush_stats["last_ms"] = cost_ms
+        logger.debug(f"[库洛签到·插件] 活跃度刷写 {written} 条，耗时 {cost_ms:.1f}ms，累计 {_flush_stats}")
 
     _shutdown_event = asyncio.Event()
+    _flush_wakeup = asyncio.Event()
 
     async def _activity_flush_loop():
         while not _shutdown_event.is_set():
             try:
-                await asyncio.wait_for(_shutdown_event.wait(), timeout=_FLUSH_INTERVAL)
-                break  # shutdown signaled
+                await asyncio.wait_for(_flush_wakeup.wait(), timeout=_FLUSH_INTERVAL)
             except asyncio.TimeoutError:
                 pass
+            _flush_wakeup.clear()
+            if _shutdown_event.is_set():
+                break  # shutdown signaled
             try:
                 await _flush_activity_buffer()
             except Exception as e:
@@ -56,6 +76,7 @@ try:
     async def _flush_on_shutdown():
         logger.info("[库洛签到·插件] 退出前停止活跃度刷写循环...")
         _shutdown_event.set()
+        _flush_wakeup.set()
         try:
             await asyncio.wait_for(_flush_task, timeout=5)
         except asyncio.TimeoutError:
@@ -80,7 +101,9 @@ try:
             return
         if not user_id:
             return
-        _activity_buffer[f"{user_id}:{bot_id}:{bot_self_id}"] = (user_id, bot_id, bot_self_id)
+        _activity_buffer[(user_id, bot_id, bot_self_id)] = int(time.time())
+        if len(_activity_buffer) >= _MAX_BUFFER_SIZE:
+            _flush_wakeup.set()
 
     # 安装 hooks 并注册
     logger.info("[库洛签到·插件] 开始安装和注册 hooks...")
@@ -5,6 +5,7 @@ from gsuid_core.sv import SV, get_plugin_available_prefix
 
 from ..utils.api.api import PGR_GAME_ID, WAVES_GAME_ID
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.plugin_checker import rover_plugin_handler
 from ..utils.util import get_hide_uid_pref, hide_uid
 from .set_config import set_config_func, set_pgr_config_func
 
@@ -26,6 +27,7 @@ Args:
     text: "自动签到" / "鸣潮自动签到" / "战双自动签到"。例: command="开启" + text="自动签到"。
 """,
 )
+@rover_plugin_handler
 async def open_switch_func(bot: Bot, ev: Event):
     if ev.text == "战双自动签到":
         return await _handle_pgr_switch(bot, ev)
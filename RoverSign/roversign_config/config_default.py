@@ -83,6 +83,47 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "签到以图片形式报告",
         False,
     ),
+    "GroupReportChunkSize": GsIntConfig(
+        "群报告每条消息最多@人数",
+        "群签到报告中失败名单超过此人数时拆分为多条消息发送",
+        20,
+        100,
+    ),
+    "MergeSignReport": GsBoolConfig(
+        "合并签到报告",
+        "开启后游戏签到（鸣潮、战双）与社区签到的结果合并为每人 / 每群一条消息推送",
+        True,
+    ),
+    "BoardcastPerMinute": GsIntConfig(
+        "每个bot每分钟推送条数",
+        "签到报告推送限速，每个bot（按平台区分）独立计算，不同bot并发推送",
+        20,
+        600,
+    ),
+    "BoardcastBurst": GsIntConfig(
+        "推送突发条数",
+        "每个bot允许连续推送的最大条数，超出后按限速排队",
+        3,
+        20,
+    ),
+    "BoardcastRetry": GsIntConfig(
+        "推送失败重试次数",
+        "推送失败后按指数退避重试的次数",
+        2,
+        5,
+    ),
+    "ImageEncodeFormat": GsStrConfig(
+        "图片编码格式",
+        "签到报告、帮助图发送时的编码格式：png / png_palette（调色板，体积小）/ webp / jpeg",
+        "png_palette",
+        options=["png", "png_palette", "webp", "jpeg"],
+    ),
+    "ImageEncodeQuality": GsIntConfig(
+        "图片编码质量",
+        "webp / jpeg 编码质量（1-100）",
+        85,
+        100,
+    ),
     "KuroUrlProxyUrl": GsStrConfig(
         "库洛域名代理（重载生效）",
         "库洛域名代理（重载生效）",
@@ -6,6 +6,7 @@ from gsuid_core.subscribe import gs_subscribe
 
 from ..utils.api.api import PGR_GAME_ID
 from ..utils.database.models import WavesUser
+from ..utils.subscribe_index import invalidate_subscribe_index
 from ..utils.util import get_hide_uid_pref, hide_uid
 
 
@@ -26,6 +27,15 @@ async def get_bbs_signin_config():
     return master or signin
 
 
+async def _update_sign_subscribe(ev: Event, subscribe: bool):
+    """增删签到结果推送订阅，并使缓存的订阅索引失效"""
+    if subscribe:
+        await gs_subscribe.add_subscribe("single", BoardcastTypeEnum.SIGN_WAVES, ev)
+    else:
+        await gs_subscribe.delete_subscribe("single", BoardcastTypeEnum.SIGN_WAVES, ev)
+    invalidate_subscribe_index(BoardcastTypeEnum.SIGN_WAVES)
+
+
 async def set_config_func(ev: Event, uid: str = "0"):
     config_name = ev.text
     if "开启" in ev.command:
@@ -51,14 +61,7 @@ async def set_config_func(ev: Event, uid: str = "0"):
         )
 
         if ev.bot_id == "onebot":
-            if option == "off":
-                await gs_subscribe.delete_subscribe(
-                    "single", BoardcastTypeEnum.SIGN_WAVES, ev
-                )
-            else:
-                await gs_subscribe.add_subscribe(
-                    "single", BoardcastTypeEnum.SIGN_WAVES, ev
-                )
+            await _update_sign_subscribe(ev, option != "off")
 
         if option != "off":
             from .roversign_config import RoverSignConfig
@@ -106,7 +109,7 @@ async def set_pgr_config_func(ev: Event, pgr_uid: str = "0"):
 
     # 签到结果推送是按用户订阅的, 关闭单个游戏时不退订(可能鸣潮仍开着)
     if ev.bot_id == "onebot" and option != "off":
-        await gs_subscribe.add_subscribe("single", BoardcastTypeEnum.SIGN_WAVES, ev)
+        await _update_sign_subscribe(ev, True)
 
     act = "开启" if option != "off" else "关闭"
     pref = await get_hide_uid_pref(pgr_uid, ev.user_id, ev.bot_id, game_id=PGR_GAME_ID)
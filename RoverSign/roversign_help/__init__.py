@@ -1,11 +1,14 @@
-from PIL import Image
+from datetime import datetime, timedelta
 
+from gsuid_core.aps import scheduler
 from gsuid_core.bot import Bot
 from gsuid_core.help.utils import register_help
 from gsuid_core.models import Event
 from gsuid_core.sv import SV, get_plugin_available_prefix
 
-from .get_help import ICON, get_help
+from ..utils.image import get_ICON
+from ..utils.plugin_checker import rover_plugin_handler
+from .get_help import get_help, prerender_help
 
 sv_rover_help = SV("RoverSign帮助", priority=10)
 
@@ -20,9 +23,18 @@ Args:
     text: 无需参数。
 """,
 )
+@rover_plugin_handler
 async def send_help_img(bot: Bot, ev: Event):
     await bot.send(await get_help(ev.user_pm))
 
 
 PREFIX = get_plugin_available_prefix("RoverSign")
-register_help("RoverSignUID", f"{PREFIX}签到帮助", Image.open(ICON))
+register_help("RoverSignUID", f"{PREFIX}签到帮助", get_ICON())
+
+# 启动后在后台预渲染帮助图
+scheduler.add_job(
+    prerender_help,
+    "date",
+    run_date=datetime.now() + timedelta(seconds=20),
+    id="prerender_rover_help_on_startup",
+)
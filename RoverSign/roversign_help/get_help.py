@@ -1,13 +1,17 @@
 import json
+import time
+from io import BytesIO
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from PIL import Image
 
 from gsuid_core.help.draw_new_plugin_help import get_new_help
+from gsuid_core.logger import logger
 from gsuid_core.help.model import PluginHelp
 from gsuid_core.sv import get_plugin_available_prefix
-from ..utils.image import get_footer
+from ..utils.image import get_footer, get_ICON, load_image_asset
+from ..utils.render_pool import get_encode_options, encode_image, run_in_render_pool
 from ..version import RoverSign_version
 
 ICON = Path(__file__).parent.parent.parent / "ICON.png"
@@ -16,6 +20,10 @@ ICON_PATH = Path(__file__).parent / "icon_path"
 TEXT_PATH = Path(__file__).parent / "texture2d"
 
 
+# 预渲染的权限等级（gsuid_core 中 0 为主人，6 为普通用户）
+HELP_PM_LEVELS = range(0, 7)
+
+
 def get_help_data() -> Dict[str, PluginHelp]:
     # 读取文件内容
     with open(HELP_DATA, "r", encoding="utf-8") as file:
@@ -23,22 +31,97 @@ def get_help_data() -> Dict[str, PluginHelp]:
 
 
 plugin_help = get_help_data()
+_help_data_mtime = HELP_DATA.stat().st_mtime
+
+# pm -> 编码后的帮助图
+_help_cache: Dict[int, bytes] = {}
+_help_cache_key: Optional[Tuple] = None
+
+
+def _current_cache_key() -> Tuple:
+    """帮助图缓存键：help.json 修改时间 + 插件版本 + 编码配置"""
+    global plugin_help, _help_data_mtime
+
+    mtime = HELP_DATA.stat().st_mtime
+    if mtime != _help_data_mtime:
+        plugin_help = get_help_data()
+        _help_data_mtime = mtime
+    return (mtime, RoverSign_version, *get_encode_options())
+
+
+def _check_help_cache():
+    global _help_cache_key
+
+    key = _current_cache_key()
+    if key != _help_cache_key:
+        if _help_cache_key is not None:
+            logger.info("[库洛签到·帮助] 帮助数据或版本已变化，重新绘制帮助图")
+        _help_cache.clear()
+        _help_cache_key = key
 
 
 async def get_help(pm: int):
+    _check_help_cache()
+    if (cached := _help_cache.get(pm)) is not None:
+        return cached
+
+    # get_new_help 依赖 core 的事件循环与缓存，留在当前循环绘制；
+    # 只把较重的 PIL 重新编码放到渲染线程池，失败时回退到当前线程编码
+    data = await _draw_help(pm)
+    if not isinstance(data, bytes):
+        return data
+    try:
+        encoded = await run_in_render_pool(_reencode_help, data)
+    except Exception as e:
+        logger.warning(f"[库洛签到·帮助] 线程池编码帮助图失败，回退直接编码: {e}")
+        try:
+            encoded = _reencode_help(data)
+        except Exception as e:
+            # 编码本身出错时直接返回原图，不缓存
+            logger.warning(f"[库洛签到·帮助] 编码帮助图失败，返回原图: {e}")
+            return data
+
+    _help_cache[pm] = encoded
+    return encoded
+
+
+async def prerender_help():
+    """启动后在后台预先绘制各权限等级的帮助图"""
+    start = time.perf_counter()
+    for pm in HELP_PM_LEVELS:
+        try:
+            await get_help(pm)
+        except Exception as e:
+            logger.warning(f"[库洛签到·帮助] 预渲染 pm={pm} 帮助图失败: {e}")
+    logger.info(
+        f"[库洛签到·帮助] 已预渲染 {len(_help_cache)} 张帮助图，"
+        f"耗时 {time.perf_counter() - start:.2f}s"
+    )
+
+
+def _reencode_help(data: bytes) -> bytes:
+    """按配置的格式重新编码帮助图（带照片背景，不做调色板量化）
+
+    照片背景重新编码为无损 PNG 时可能比原图更大，取二者中较小的一份
+    """
+    encoded = encode_image(Image.open(BytesIO(data)), allow_palette=False)
+    return encoded if len(encoded) < len(data) else data
+
+
+async def _draw_help(pm: int):
     PREFIX = get_plugin_available_prefix("RoverSign")
     return await get_new_help(
         plugin_name="RoverSign",
         plugin_info={f"v{RoverSign_version}": ""},
-        plugin_icon=Image.open(ICON),
+        plugin_icon=get_ICON(),
         plugin_help=plugin_help,
         plugin_prefix=PREFIX,
         help_mode="dark",
-        banner_bg=Image.open(TEXT_PATH / "banner_bg.jpg"),
+        banner_bg=load_image_asset(TEXT_PATH / "banner_bg.jpg"),
         banner_sub_text="为了寻回记忆而踏上旅途。",
-        help_bg=Image.open(TEXT_PATH / "bg.jpg"),
-        cag_bg=Image.open(TEXT_PATH / "cag_bg.png"),
-        item_bg=Image.open(TEXT_PATH / "item.png"),
+        help_bg=load_image_asset(TEXT_PATH / "bg.jpg"),
+        cag_bg=load_image_asset(TEXT_PATH / "cag_bg.png"),
+        item_bg=load_image_asset(TEXT_PATH / "item.png"),
         icon_path=ICON_PATH,
         footer=get_footer(),
         enable_cache=True,
@@ -1,3 +1,5 @@
+import time
+
 from gsuid_core.aps import scheduler
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
@@ -6,10 +8,16 @@ from gsuid_core.subscribe import gs_subscribe
 from gsuid_core.sv import SV
 
 from ..roversign_config.roversign_config import RoverSignConfig
+from ..utils.boardcast import start_boardcast_outbox
 from ..utils.constant import BoardcastTypeEnum
-from ..utils.database.models import RoverSign
+from ..utils.database.rover_sign_history import RoverSignHistory
+from ..utils.database.rover_subscribe import RoverSubscribe
+from ..utils.database.sign_mirror import today_sign_mirror
+from ..utils.plugin_checker import rover_plugin_handler
 from ..utils.util import get_two_days_ago_date
 from ..utils.sign_state import signing_state
+from ..utils.subscribe_index import get_subscribe_index, invalidate_subscribe_index
+from .main import get_bbs_link_config
 from .new_sign import rover_auto_sign_task, rover_sign_up_handler
 
 sv_waves_sign = SV("RoverSign-签到", priority=1)
@@ -40,8 +48,14 @@ Args:
     text: 无需参数，留空即可。
 """,
 )
+@rover_plugin_handler
 async def rover_user_sign(bot: Bot, ev: Event):
+    start = time.perf_counter()
     msg = await rover_sign_up_handler(bot, ev)
+    logger.debug(
+        f"[库洛签到·签到] user_id={ev.user_id} 签到指令处理耗时 "
+        f"{(time.perf_counter() - start) * 1000:.1f}ms"
+    )
     return await bot.send(msg)
 
 
@@ -51,11 +65,10 @@ async def rover_auto_sign():
 
     try:
         msg = await rover_auto_sign_task()
-        subscribes = await gs_subscribe.get_subscribe(BoardcastTypeEnum.SIGN_RESULT)
-        if subscribes:
+        sub_index = await get_subscribe_index(BoardcastTypeEnum.SIGN_RESULT)
+        if sub_index.subs:
             logger.info(f"[库洛签到·签到] 推送主人签到结果: {msg}")
-            from ..utils.database.rover_subscribe import RoverSubscribe
-            for sub in subscribes:
+            for sub in sub_index.subs:
                 # 对 group 订阅，用 RoverSubscribe 获取最新 bot_self_id
                 if sub.user_type == "group" and sub.group_id:
                     latest_bot = await RoverSubscribe.get_group_bot(sub.group_id)
@@ -131,6 +144,7 @@ else:
 
 
 @waves_sign_all.on_fullmatch(("全部签到", "qbqd"), block=True)
+@rover_plugin_handler
 async def rover_sign_recheck_all(bot: Bot, ev: Event):
     # 检查是否已经在签到中
     if signing_state.is_signing():
@@ -152,6 +166,7 @@ async def rover_sign_recheck_all(bot: Bot, ev: Event):
 
 
 @waves_sign_all.on_regex(("^(订阅|取消订阅)签到结果$"))
+@rover_plugin_handler
 async def rover_sign_result(bot: Bot, ev: Event):
 
     if "取消" in ev.raw_text:
@@ -167,15 +182,24 @@ async def rover_sign_result(bot: Bot, ev: Event):
         await gs_subscribe.delete_subscribe("single", BoardcastTypeEnum.SIGN_RESULT, ev)
     else:
         await gs_subscribe.add_subscribe("single", BoardcastTypeEnum.SIGN_RESULT, ev)
+    invalidate_subscribe_index(BoardcastTypeEnum.SIGN_RESULT)
 
     await bot.send(f"[RoverSign] [订阅签到结果] 已{option}订阅!")
 
 
 @scheduler.scheduled_job("cron", hour=0, minute=5, id="clear_end_sign")
 async def clear_rover_sign_record():
-    """清除2天前的签到记录"""
-    await RoverSign.clear_sign_record(get_two_days_ago_date())
-    logger.info("[库洛签到·清除签到记录] 已清除2天前的签到记录!")
+    """归档并清除2天前的签到记录"""
+    num = await RoverSignHistory.archive_and_clear(
+        get_two_days_ago_date(), get_bbs_link_config()
+    )
+    logger.info(f"[库洛签到·清除签到记录] 已归档并清除2天前的签到记录 {num} 条!")
+
+
+@scheduler.scheduled_job("cron", hour=0, minute=0, second=5, id="load_today_sign_mirror")
+async def load_today_sign_mirror():
+    """跨日后加载今日签到状态镜像"""
+    await today_sign_mirror.ensure_loaded()
 
 
 # 启动时检查是否需要恢复签到任务
@@ -218,3 +242,27 @@ scheduler.add_job(
     id="resume_signing_on_startup",
 )
 logger.info("[库洛签到·签到] 已注册启动恢复任务，将在启动后10秒检查未完成的签到")
+
+# 启动后加载今日签到状态镜像
+scheduler.add_job(
+    load_today_sign_mirror,
+    "date",
+    run_date=datetime.now() + timedelta(seconds=5),
+    id="load_sign_mirror_on_startup",
+)
+
+# 启动后加载群组bot映射，之后的群消息只比对内存
+scheduler.add_job(
+    RoverSubscribe.load_group_bot_cache,
+    "date",
+    run_date=datetime.now() + timedelta(seconds=5),
+    id="load_group_bot_cache_on_startup",
+)
+
+# 启动后继续投递发件箱中的签到报告
+scheduler.add_job(
+    start_boardcast_outbox,
+    "date",
+    run_date=datetime.now() + timedelta(seconds=15),
+    id="start_boardcast_outbox_on_startup",
+)
@@ -1,6 +1,8 @@
 import asyncio
 import random
-from typing import Dict, Optional, Set, Union
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Set, Tuple, Union
 
 from PIL import Image, ImageDraw
 
@@ -10,7 +12,7 @@ from gsuid_core.segment import MessageSegment
 from ..roversign_config.roversign_config import RoverSignConfig
 from ..utils.database.models import RoverSign, RoverSignData
 from ..utils.database.states import SignStatus
-from ..utils.fonts.waves_fonts import waves_font_24
+from ..utils.fonts.waves_fonts import waves_font_origin
 from ..utils.rover_api import rover_api
 from ..utils.util import hide_uid
 
@@ -574,71 +576,79 @@ async def pgr_sign_in(
     return f"签到失败：{sign_in_res.msg}"
 
 
+# 预定义主题颜色
+SIGN_INFO_THEMES: Dict[str, Tuple[int, int, int]] = {
+    "blue": (230, 230, 255),  # 浅蓝
+    "yellow": (255, 255, 230),  # 浅黄
+    "pink": (255, 230, 230),  # 浅粉
+    "green": (230, 255, 230),  # 浅绿
+}
+
+
+@lru_cache(maxsize=16)
+def _gradient_background(width, height, start_color, end_color) -> Image.Image:
+    # 只计算 1 像素宽的一列，再横向拉伸，颜色与逐像素绘制一致
+    column = bytearray()
+    for y in range(height):
+        ratio = y / height
+        column += bytes(
+            int(end_color[i] * ratio + start_color[i] * (1 - ratio)) for i in range(3)
+        )
+    return Image.frombytes("RGB", (1, height), bytes(column)).resize(
+        (width, height), Image.NEAREST
+    )
+
+
 def create_gradient_background(width, height, start_color, end_color=(255, 255, 255)):
     """
     使用 PIL 创建渐变背景
     start_color: 起始颜色，如 (230, 230, 255) 浅蓝
     end_color: 结束颜色，默认白色
     """
-    # 创建新图像
-    image = Image.new("RGB", (width, height))
+    return _gradient_background(
+        width, height, tuple(start_color), tuple(end_color)
+    ).copy()
 
-    for y in range(height):
-        # 计算当前行的颜色比例
-        ratio = y / height
 
-        # 计算当前行的 RGB 值
-        r = int(end_color[0] * ratio + start_color[0] * (1 - ratio))
-        g = int(end_color[1] * ratio + start_color[1] * (1 - ratio))
-        b = int(end_color[2] * ratio + start_color[2] * (1 - ratio))
-
-        # 创建当前行的颜色
-        line_color = (r, g, b)
-        # 绘制当前行
-        for x in range(width):
-            image.putpixel((x, y), line_color)
+@lru_cache(maxsize=16)
+def _sign_info_template(theme: str, width: int, height: int) -> Image.Image:
+    """渐变背景 + 装饰边框的底图，按 (主题, 宽, 高) 缓存"""
+    start_color = SIGN_INFO_THEMES.get(theme, SIGN_INFO_THEMES["blue"])
+    img = create_gradient_background(width, height, start_color)
+    draw = ImageDraw.Draw(img)
 
-    return image
+    # 绘制装饰边框
+    border_color = (200, 200, 200)
+    draw.rectangle([(10, 10), (width - 10, height - 10)], outline=border_color, width=2)
+    return img
 
 
 def create_sign_info_image(text, theme="blue"):
+    start = time.perf_counter()
     text = text[1:]
     # 创建图片
     width = 600
     height = 250  # 稍微减小高度使布局更紧凑
 
-    # 预定义主题颜色
-    themes = {
-        "blue": (230, 230, 255),  # 浅蓝
-        "yellow": (255, 255, 230),  # 浅黄
-        "pink": (255, 230, 230),  # 浅粉
-        "green": (230, 255, 230),  # 浅绿
-    }
-
-    # 获取主题颜色，默认浅蓝
-    start_color = themes.get(theme, themes["blue"])
-
-    # 创建渐变背景
-    img = create_gradient_background(width, height, start_color)
+    img = _sign_info_template(theme, width, height).copy()
     draw = ImageDraw.Draw(img)
 
     # 颜色定义
     title_color = (51, 51, 51)  # 标题色
 
-    # 绘制装饰边框
-    border_color = (200, 200, 200)
-    draw.rectangle([(10, 10), (width - 10, height - 10)], outline=border_color, width=2)
-
     # 文本处理
     lines = text.split("\n")
     left_margin = 40  # 左边距
     y = 40  # 起始y坐标
 
     for i, line in enumerate(lines):
-        draw.text((left_margin, y), line, font=waves_font_24, fill=title_color)
+        draw.text((left_margin, y), line, font=waves_font_origin(24), fill=title_color)
         if i == 0:
             y += 60
         else:
             y += 45
 
+    logger.debug(
+        f"[库洛签到·签到] 签到报告图片绘制耗时 {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
     return img
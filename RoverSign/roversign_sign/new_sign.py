@@ -9,20 +9,23 @@ from gsuid_core.segment import MessageSegment
 from gsuid_core.utils.boardcast.models import BoardCastMsg, BoardCastMsgDict
 
 from ..roversign_config.roversign_config import RoverSignConfig
-from ..utils.boardcast import send_board_cast_msg
+from ..utils.boardcast import merge_board_cast_msg, send_board_cast_msg
 from ..utils.constant import BoardcastTypeEnum
 from ..utils.database.models import (
     RoverSign,
     RoverSignData,
-    WavesBind,
     WavesUser,
+    WavesUserRecord,
 )
 from ..utils.database.rover_subscribe import WavesSubscribeReader
+from ..utils.database.sign_buffer import sign_write_buffer
+from ..utils.database.sign_snapshot import SignSnapshotLoader
 from ..utils.database.states import SignStatus
+from ..utils.render_pool import EventLoopLagMonitor, render_image
 from ..utils.errors import WAVES_CODE_101_MSG
 from ..utils.api.api import WAVES_GAME_ID, PGR_GAME_ID
 from ..utils.rover_api import rover_api
-from ..utils.util import get_hide_uid_pref, hide_uid
+from ..utils.util import hide_uid
 from .main import (
     create_sign_info_image,
     do_single_task,
@@ -142,19 +145,14 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     if not waves_enabled and not pgr_enabled and not bbs_enabled:
         return "签到功能未开启"
 
-    # 获取绑定数据
-    bind_data = await WavesBind.select_data(ev.user_id, ev.bot_id)
-    if not bind_data:
+    # 一次性加载绑定、账号、隐藏偏好和今日签到状态
+    snapshot = await SignSnapshotLoader.load(ev.user_id, ev.bot_id)
+    if not snapshot:
         return WAVES_CODE_101_MSG
 
     # 获取所有 UID
-    waves_uid_list = []
-    if bind_data.uid:
-        waves_uid_list = [u for u in bind_data.uid.split("_") if u]
-
-    pgr_uid_list = []
-    if bind_data.pgr_uid:
-        pgr_uid_list = [u for u in bind_data.pgr_uid.split("_") if u]
+    waves_uid_list = snapshot.waves_uid_list
+    pgr_uid_list = snapshot.pgr_uid_list
 
     if not waves_uid_list and not pgr_uid_list:
         return WAVES_CODE_101_MSG
@@ -163,42 +161,22 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     waves_net_uid_list = [u for u in waves_uid_list if rover_api.is_net(u)]
     waves_uid_list = [u for u in waves_uid_list if not rover_api.is_net(u)]
 
-    # 更新鸣潮账号的最后使用时间
-    if waves_uid_list:
-        for waves_uid in waves_uid_list:
-            await WavesUser.update_last_used_time(
-                waves_uid,
-                ev.user_id,
-                ev.bot_id,
-                game_id=WAVES_GAME_ID,
-            )
-
-    # 更新战双账号的最后使用时间
-    if pgr_uid_list:
-        for pgr_uid in pgr_uid_list:
-            await WavesUser.update_last_used_time(
-                pgr_uid,
-                ev.user_id,
-                ev.bot_id,
-                game_id=PGR_GAME_ID,
-            )
+    # 一次性更新鸣潮和战双账号的最后使用时间
+    await WavesUser.batch_update_last_used_time(
+        ev.user_id,
+        ev.bot_id,
+        [
+            *[(uid, WAVES_GAME_ID) for uid in waves_uid_list],
+            *[(uid, PGR_GAME_ID) for uid in pgr_uid_list],
+        ],
+    )
 
     waves_user_prefs = {
-        uid: await get_hide_uid_pref(
-            uid,
-            ev.user_id,
-            ev.bot_id,
-            game_id=WAVES_GAME_ID,
-        )
+        uid: snapshot.get_hide_uid_pref(uid, game_id=WAVES_GAME_ID)
         for uid in [*waves_uid_list, *waves_net_uid_list]
     }
     pgr_user_prefs = {
-        uid: await get_hide_uid_pref(
-            uid,
-            ev.user_id,
-            ev.bot_id,
-            game_id=PGR_GAME_ID,
-        )
+        uid: snapshot.get_hide_uid_pref(uid, game_id=PGR_GAME_ID)
         for uid in pgr_uid_list
     }
 
@@ -217,7 +195,7 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     # 检查鸣潮签到状态
     if waves_enabled and waves_uid_list:
         for waves_uid in waves_uid_list:
-            rover_sign = await RoverSign.get_sign_data(waves_uid)
+            rover_sign = snapshot.get_sign_data(waves_uid)
             if not rover_sign or not SignStatus.waves_game_sign_complete(rover_sign):
                 all_completed = False
                 break
@@ -225,14 +203,14 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     # 检查战双签到状态
     if all_completed and pgr_enabled and pgr_uid_list:
         for pgr_uid in pgr_uid_list:
-            rover_sign = await RoverSign.get_sign_data(pgr_uid)
+            rover_sign = snapshot.get_sign_data(pgr_uid)
             if not rover_sign or not SignStatus.pgr_game_sign_complete(rover_sign):
                 all_completed = False
                 break
 
     # 检查社区签到状态
     if all_completed and bbs_enabled and main_uid:
-        rover_sign = await RoverSign.get_sign_data(main_uid)
+        rover_sign = snapshot.get_sign_data(main_uid)
         if not rover_sign or not SignStatus.bbs_sign_complete(rover_sign, bbs_link_config):
             all_completed = False
 
@@ -283,7 +261,7 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
                 continue
 
             waves_signed = False
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(waves_uid)
+            rover_sign: Optional[RoverSign] = snapshot.get_sign_data(waves_uid)
             if rover_sign and SignStatus.waves_game_sign_complete(rover_sign):
                 waves_signed = "skip"
             else:
@@ -299,7 +277,7 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     if pgr_enabled and pgr_uid_list and main_token:
         for pgr_uid in pgr_uid_list:
             pgr_signed = False
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(pgr_uid)
+            rover_sign: Optional[RoverSign] = snapshot.get_sign_data(pgr_uid)
             if rover_sign and SignStatus.pgr_game_sign_complete(rover_sign):
                 pgr_signed = "skip"
             else:
@@ -315,7 +293,7 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
     if bbs_enabled and main_token:
         bbs_signed = False
         if main_uid:
-            rover_sign: Optional[RoverSign] = await RoverSign.get_sign_data(main_uid)
+            rover_sign: Optional[RoverSign] = snapshot.get_sign_data(main_uid)
             if rover_sign and SignStatus.bbs_sign_complete(rover_sign, bbs_link_config):
                 bbs_signed = "skip"
             else:
@@ -341,7 +319,7 @@ async def rover_sign_up_handler(bot: Bot, ev: Event):
 
 async def rover_auto_sign_task():
 
-    need_user_list: List[WavesUser] = []
+    need_user_list: List[WavesUserRecord] = []
     bbs_user = set()
     waves_sign_user = set()
     pgr_sign_user = set()
@@ -352,9 +330,6 @@ async def rover_auto_sign_task():
         or RoverSignConfig.get_config("SchedSignin").data
         or RoverSignConfig.get_config("UserPGRSignin").data
     ):
-        # 获取所有用户（SigninMaster 和定时任务都需要）
-        _all_user_list: List[WavesUser] = await WavesUser.get_waves_all_user()
-
         # 获取活跃用户集合（仅签到活跃账号 / 全部签到跳过不活跃 共用）
         sign_active_only = RoverSignConfig.get_config("SignActiveUserOnly").data
         master_skip_inactive = bool(
@@ -363,15 +338,18 @@ async def rover_auto_sign_task():
         )
         if sign_active_only or master_skip_inactive:
             active_days = RoverSignConfig.get_config("ActiveUserDays").data
-            _active_user_set = set(u.uid for u in await WavesUser.get_active_waves_user(active_days))
+            _active_user_set = {
+                u.uid async for u in WavesUser.iter_sign_users(active_days=active_days)
+            }
             logger.info(f"[库洛签到·签到] 活跃过滤已开启，活跃天数：{active_days}，活跃用户数：{len(_active_user_set)}")
         else:
             _active_user_set = None
             logger.info(f"[库洛签到·签到] 定时任务签到所有账号")
 
-        logger.info(f"[库洛签到·签到] 总用户数：{len(_all_user_list)}")
-
-        for _i, user in enumerate(_all_user_list):
+        # 流式遍历所有用户（SigninMaster 和定时任务都需要）
+        _i = -1
+        async for user in WavesUser.iter_sign_users():
+            _i += 1
             _uid = user.user_id
             if not _uid:
                 continue
@@ -444,6 +422,8 @@ async def rover_auto_sign_task():
             if is_need:
                 need_user_list.append(user)
 
+        logger.info(f"[库洛签到·签到] 总用户数：{_i + 1}")
+
     private_waves_sign_msgs = {}
     group_waves_sign_msgs = {}
     all_waves_sign_msgs = {"failed": 0, "success": 0}
@@ -458,7 +438,7 @@ async def rover_auto_sign_task():
 
     _USER_TIMEOUT = 120  # 单个用户签到超时（秒）
 
-    async def _process_user_inner(user: WavesUser):
+    async def _process_user_inner(user: WavesUserRecord):
         await asyncio.sleep(random.random() * 1.5)
         if user.cookie == "":
             return
@@ -547,7 +527,7 @@ async def rover_auto_sign_task():
             await asyncio.sleep(random.randint(2, 4))
         logger.info(f"[库洛签到·自动] UID {user.uid} 签到任务完成")
 
-    async def process_user(semaphore, user: WavesUser):
+    async def process_user(semaphore, user: WavesUserRecord):
         logger.debug(f"[库洛签到·自动] 处理 UID {user.uid} 的签到任务")
         async with semaphore:
             try:
@@ -563,7 +543,9 @@ async def rover_auto_sign_task():
     max_concurrent: int = RoverSignConfig.get_config("SigninConcurrentNum").data
     semaphore = asyncio.Semaphore(max_concurrent)
     tasks = [process_user(semaphore, user) for user in need_user_list]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # 签到期间的 RoverSign 写入先合并缓冲，批量落库，结束时强制刷写
+    async with sign_write_buffer.batching():
+        results = await asyncio.gather(*tasks, return_exceptions=True)
     for result in results:
         if isinstance(result, Exception):
             return f"{result.args[0]}"
@@ -602,7 +584,6 @@ async def rover_auto_sign_task():
         game_sign_result["private_msg_dict"] = {}
     if not RoverSignConfig.get_config("GroupSignReport").data:
         game_sign_result["group_msg_dict"] = {}
-    await send_board_cast_msg(game_sign_result, BoardcastTypeEnum.SIGN_WAVES)
 
     # 社区签到结果广播
     bbs_result = await to_board_cast_msg(
@@ -612,7 +593,16 @@ async def rover_auto_sign_task():
         bbs_result["private_msg_dict"] = {}
     if not RoverSignConfig.get_config("GroupSignReport").data:
         bbs_result["group_msg_dict"] = {}
-    await send_board_cast_msg(bbs_result, BoardcastTypeEnum.SIGN_WAVES)
+
+    if RoverSignConfig.get_config("MergeSignReport").data:
+        # 游戏签到与社区签到合并为每个接收者一条消息
+        await send_board_cast_msg(
+            merge_board_cast_msg(game_sign_result, bbs_result),
+            BoardcastTypeEnum.SIGN_WAVES,
+        )
+    else:
+        await send_board_cast_msg(game_sign_result, BoardcastTypeEnum.SIGN_WAVES)
+        await send_board_cast_msg(bbs_result, BoardcastTypeEnum.SIGN_WAVES)
 
     # 构建返回消息
     msg_parts = ["[库洛]自动任务"]
@@ -629,6 +619,40 @@ async def rover_auto_sign_task():
     return "\n".join(msg_parts)
 
 
+# 群报告单条消息的字符上限（超出后拆分为多条）
+GROUP_REPORT_MAX_CHARS = 1500
+
+
+def split_push_message(push_message: List, max_items: int) -> List[List]:
+    """把群报告的失败列表按条数 / 字数拆分为多段
+
+    push_message 由若干条 [换行, @用户, 结果文本] 组成，拆分时不会把一条截断。
+    """
+    entries: List[List] = []
+    for seg in push_message:
+        if (seg.type == "text" and seg.data == "\n") or not entries:
+            entries.append([])
+        entries[-1].append(seg)
+
+    chunks: List[List] = []
+    chunk: List = []
+    count = chars = 0
+    for entry in entries:
+        size = sum(len(str(seg.data)) for seg in entry)
+        if chunk and (count >= max_items or chars + size > GROUP_REPORT_MAX_CHARS):
+            chunks.append(chunk)
+            chunk, count, chars = [], 0, 0
+        if not chunk and chunks and entry[0].type == "text" and entry[0].data == "\n":
+            # 后续分段去掉开头的换行
+            entry = entry[1:]
+        chunk.extend(entry)
+        count += 1
+        chars += size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
 async def to_board_cast_msg(
     private_msgs,
     group_msgs,
@@ -637,7 +661,7 @@ async def to_board_cast_msg(
 ):
     # 转为广播消息
     private_msg_dict: Dict[str, List[BoardCastMsg]] = {}
-    group_msg_dict: Dict[str, BoardCastMsg] = {}
+    group_msg_dict: Dict[str, List[BoardCastMsg]] = {}
     for qid in private_msgs:
         msgs = []
         for _, i in enumerate(private_msgs[qid]):
@@ -655,6 +679,34 @@ async def to_board_cast_msg(
             }
         )
 
+    # 批量解析所有群的 bot_self_id：内存映射 + 每张表一次 IN 查询
+    from ..utils.database.rover_subscribe import RoverSubscribe
+    group_bots = await RoverSubscribe.get_group_bots(group_msgs)
+    missing_gids = [gid for gid in group_msgs if gid not in group_bots]
+    if missing_gids:
+        group_bots.update(await WavesSubscribeReader.get_group_bots(missing_gids))
+
+    titles = {
+        gid: f"✅[鸣潮]今日{type}任务已完成！\n本群共签到成功{group_msgs[gid]['success']}人\n共签到失败{group_msgs[gid]['failed']}人"
+        for gid in group_msgs
+    }
+    # 图片报告在渲染线程池中并发绘制，不阻塞事件循环
+    images: Dict[str, bytes] = {}
+    if titles and RoverSignConfig.get_config("GroupSignReportPic").data:
+        async with EventLoopLagMonitor(f"{type}报告渲染"):
+            rendered = await asyncio.gather(
+                *(
+                    render_image(
+                        create_sign_info_image,
+                        title,
+                        "yellow",
+                        cache_key=("sign_info", title, "yellow"),
+                    )
+                    for title in titles.values()
+                )
+            )
+        images = dict(zip(titles, rendered))
+
     failed_num = 0
     success_num = 0
     for gid in group_msgs:
@@ -662,23 +714,20 @@ async def to_board_cast_msg(
         faild = group_msgs[gid]["failed"]
         success_num += int(success)
         failed_num += int(faild)
-        title = f"✅[鸣潮]今日{type}任务已完成！\n本群共签到成功{success}人\n共签到失败{faild}人"
+        title = titles[gid]
         messages = []
-        if RoverSignConfig.get_config("GroupSignReportPic").data:
-            image = create_sign_info_image(title, theme="yellow")
-            messages.append(MessageSegment.image(image))
+        if gid in images:
+            messages.append(MessageSegment.image(images[gid]))
         else:
             messages.append(MessageSegment.text(title))
-        if group_msgs[gid]["push_message"]:
-            messages.append(MessageSegment.text("\n"))
-            messages.extend(group_msgs[gid]["push_message"])
+        chunks = split_push_message(
+            group_msgs[gid]["push_message"],
+            RoverSignConfig.get_config("GroupReportChunkSize").data,
+        )
 
         # bot_id 是平台 ID；bot_self_id 是机器人自身账号，二者不能混用。
         # 优先读取近期记录的机器人自身账号，兜底兼容旧订阅数据。
-        from ..utils.database.rover_subscribe import RoverSubscribe
-        bot_self_id = await RoverSubscribe.get_group_bot(gid)
-        if not bot_self_id:
-            bot_self_id = await WavesSubscribeReader.get_group_bot(gid)
+        bot_self_id = group_bots.get(gid)
         if not bot_self_id:
             legacy_bot_id = str(group_msgs[gid].get("bot_id", ""))
             if legacy_bot_id.isdigit():
@@ -691,11 +740,16 @@ async def to_board_cast_msg(
                 logger.warning(f"[库洛签到·签到] 群 {gid} 未找到 bot_self_id，跳过群推送组装")
                 continue
 
-        group_msg_dict[gid] = {
-            "bot_id": group_msgs[gid]["bot_id"],
-            "bot_self_id": bot_self_id,
-            "messages": messages,
-        }
+        # 首条只放标题，失败名单按分段各占一条，逐条交给推送分发器
+        # （合并报告时只合并标题，单条消息大小仍受分段上限约束）
+        group_msg_dict[gid] = [
+            {
+                "bot_id": group_msgs[gid]["bot_id"],
+                "bot_self_id": bot_self_id,
+                "messages": chunk_messages,
+            }
+            for chunk_messages in [messages, *chunks]
+        ]
 
     result: BoardCastMsgDict = {
         "private_msg_dict": private_msg_dict,
@@ -1,28 +1,41 @@
 from gsuid_core.status.plugin_status import register_status
 
+from ..utils.bot_send_hook import get_hook_stats_summary
 from ..utils.database.models import RoverSign, WavesUser
+from ..utils.database.sign_mirror import today_sign_mirror
 from ..utils.image import get_ICON
-from ..utils.util import get_yesterday_date
+from ..utils.render_pool import get_encode_stats_summary
+from ..utils.util import get_yesterday_date, timed_async_cache
 
+# 状态页统计缓存时间（秒）
+STATUS_CACHE_TTL = 60
 
+
+@timed_async_cache(STATUS_CACHE_TTL)
 async def get_sign_num():
-    datas = await WavesUser.get_waves_all_user()
-    num = 0
-    for data in datas:
-        if data.sign_switch != "off":
-            num += 1
-    return num
+    return await WavesUser.get_sign_user_count()
 
 
+@timed_async_cache(STATUS_CACHE_TTL)
 async def get_today_sign_num():
-    datas = await RoverSign.get_all_sign_data_by_date()
-    return len(datas)
+    return await RoverSign.get_sign_count_by_date()
 
 
+@timed_async_cache(STATUS_CACHE_TTL)
 async def get_yesterday_sign_num():
-    yesterday = get_yesterday_date()
-    datas = await RoverSign.get_all_sign_data_by_date(date=yesterday)
-    return len(datas)
+    return await RoverSign.get_sign_count_by_date(date=get_yesterday_date())
+
+
+async def get_sign_mirror_usage():
+    return f"{len(today_sign_mirror)}条 / {today_sign_mirror.memory_usage() / 1024:.1f}KB"
+
+
+async def get_hook_cost():
+    return get_hook_stats_summary()
+
+
+async def get_image_encode_stats():
+    return get_encode_stats_summary()
 
 
 register_status(
@@ -32,5 +45,8 @@ register_status(
         "开启签到": get_sign_num,
         "今日签到": get_today_sign_num,
         "昨日签到": get_yesterday_sign_num,
+        "状态镜像": get_sign_mirror_usage,
+        "Hook耗时": get_hook_cost,
+        "图片编码": get_image_encode_stats,
     },
 )
@@ -1,14 +1,23 @@
 import asyncio
-import random
+import time
+from typing import Any, Dict, List, Optional
 
-from gsuid_core.gss import gss
 from gsuid_core.logger import logger
-from gsuid_core.subscribe import gs_subscribe
+from gsuid_core.segment import MessageSegment
+from gsuid_core.server import on_core_shutdown
 from gsuid_core.utils.boardcast.models import BoardCastMsgDict
-from gsuid_core.utils.database.models import Subscribe
 
 from ..utils.constant import BoardcastType
+from .bot_routing import BotRouter
+from .boardcast_dispatcher import BoardcastDispatcher, BoardcastJob
+from ..utils.database.rover_boardcast_outbox import (
+    RoverBoardcastOutbox,
+    dump_messages,
+    load_messages,
+)
 from ..utils.database.rover_subscribe import RoverSubscribe
+from .render_pool import EventLoopLagMonitor
+from .subscribe_index import get_subscribe_index
 
 
 def _resolve_group_target_ids(group_msg) -> tuple[str, str]:
@@ -26,75 +35,249 @@ def _resolve_group_target_ids(group_msg) -> tuple[str, str]:
     return platform_bot_id, bot_self_id
 
 
-async def send_board_cast_msg(
+def merge_board_cast_msg(*results: BoardCastMsgDict) -> BoardCastMsgDict:
+    """把多份广播结果按接收者合并，每个私聊用户 / 群只保留一条消息"""
+    private_msg_dict: Dict[str, List[Dict[str, Any]]] = {}
+    group_msg_dict: Dict[str, List[Dict[str, Any]]] = {}
+
+    for result in results:
+        for qid, items in result["private_msg_dict"].items():
+            merged = private_msg_dict.setdefault(qid, [])
+            for item in items:
+                same_bot = next((m for m in merged if m["bot_id"] == item["bot_id"]), None)
+                if same_bot is None:
+                    merged.append({"bot_id": item["bot_id"], "messages": list(item["messages"])})
+                else:
+                    same_bot["messages"].append(MessageSegment.text("\n"))
+                    same_bot["messages"].extend(item["messages"])
+
+        for gid, raw_items in result["group_msg_dict"].items():
+            items = raw_items if isinstance(raw_items, list) else [raw_items]
+            if not items:
+                continue
+            merged_items = group_msg_dict.setdefault(gid, [])
+            # 各报告的首条只有标题，合并为一条；失败名单分段依次追加，不与标题合并
+            head, *rest = items
+            if not merged_items:
+                merged_items.append({**head, "messages": list(head["messages"])})
+            else:
+                merged_items[0]["messages"].append(MessageSegment.text("\n"))
+                merged_items[0]["messages"].extend(head["messages"])
+            merged_items.extend(rest)
+
+    return {
+        "private_msg_dict": private_msg_dict,
+        "group_msg_dict": group_msg_dict,
+    }  # type: ignore
+
+
+async def _build_jobs(
     msgs: BoardCastMsgDict, board_cast_type: BoardcastType
-):
-    logger.info(f"[库洛签到·推送] {board_cast_type} 任务启动...")
+) -> List[BoardcastJob]:
+    """把广播消息展开为逐条推送任务（解析好目标 bot）"""
     private_msg_list = msgs["private_msg_dict"]
     group_msg_list = msgs["group_msg_dict"]
+    jobs: List[BoardcastJob] = []
 
-    subs = await gs_subscribe.get_subscribe(board_cast_type)
-
-    def get_private_bot_self_id(qid, bot_id):
-        """从 Subscribe 表获取私聊订阅的 bot_self_id"""
-        if not subs:
-            return ""
-        for sub in subs:
-            sub: Subscribe
-            if sub.user_type != "direct":
-                continue
-            if sub.user_id == qid and sub.bot_id == bot_id:
-                return sub.bot_self_id
-        return ""
+    # 每次推送只加载一次订阅，按 (user_id, bot_id) 建索引
+    sub_index = await get_subscribe_index(board_cast_type)
 
-    # 执行私聊推送
+    # 私聊推送
     for qid in private_msg_list:
-        try:
-            for bot_id in gss.active_bot:
-                for single in private_msg_list[qid]:
-                    bot_self_id = get_private_bot_self_id(
-                        qid, single["bot_id"]
-                    )
-                    await gss.active_bot[bot_id].target_send(
-                        single["messages"],
-                        "direct",
-                        qid,
-                        single["bot_id"],
-                        bot_self_id,
-                        "",
-                    )
-        except Exception as e:
-            logger.exception(f"[库洛签到·推送] {qid} 私聊推送失败!错误信息", e)
-        await asyncio.sleep(0.5 + random.randint(1, 3))
-    logger.info(f"[库洛签到·推送] {board_cast_type} 私聊推送完成!")
+        for single in private_msg_list[qid]:
+            jobs.append(
+                BoardcastJob(
+                    "direct",
+                    qid,
+                    single["bot_id"],
+                    sub_index.get_private_bot_self_id(qid, single["bot_id"]),
+                    single["messages"],
+                )
+            )
 
-    # 执行群聊推送
+    # 群聊推送
+    group_bots = await RoverSubscribe.get_group_bots(group_msg_list)
     for gid in group_msg_list:
-        try:
-            raw_group_items = group_msg_list[gid]
-            group_items = raw_group_items if isinstance(raw_group_items, list) else [raw_group_items]
-            bot_self_id = await RoverSubscribe.get_group_bot(gid)
-            if not bot_self_id and group_items:
-                _, bot_self_id = _resolve_group_target_ids(group_items[0])
-
-            if not bot_self_id:
-                logger.warning(f"[库洛签到·推送] 群 {gid} 无法获取 bot_self_id，跳过")
-                continue
+        raw_group_items = group_msg_list[gid]
+        group_items = raw_group_items if isinstance(raw_group_items, list) else [raw_group_items]
+        bot_self_id = group_bots.get(gid)
+        if not bot_self_id and group_items:
+            _, bot_self_id = _resolve_group_target_ids(group_items[0])
+
+        if not bot_self_id:
+            logger.warning(f"[库洛签到·推送] 群 {gid} 无法获取 bot_self_id，跳过")
+            continue
+
+        for group in group_items:
+            platform_bot_id, item_bot_self_id = _resolve_group_target_ids(group)
+            jobs.append(
+                BoardcastJob(
+                    "group",
+                    gid,
+                    platform_bot_id,
+                    item_bot_self_id or bot_self_id,
+                    group["messages"],
+                )
+            )
+    return jobs
+
+
+async def send_board_cast_msg(
+    msgs: BoardCastMsgDict, board_cast_type: BoardcastType
+) -> int:
+    """把广播消息写入发件箱，由后台发送器投递
+
+    Returns:
+        int: 写入发件箱的消息条数
+    """
+    jobs = await _build_jobs(msgs, board_cast_type)
+    queued = await RoverBoardcastOutbox.enqueue(
+        [
+            {
+                "task_name": str(board_cast_type),
+                "target_type": job.target_type,
+                "target_id": job.target_id,
+                "bot_id": job.bot_id,
+                "bot_self_id": job.bot_self_id,
+                "messages": dump_messages(job.messages),
+            }
+            for job in jobs
+        ]
+    )
+    logger.info(f"[库洛签到·推送] {board_cast_type} 已写入发件箱 {queued} 条")
+    if queued:
+        boardcast_outbox_sender.wakeup()
+    return queued
+
 
-            for ws_bot_id in gss.active_bot:
-                for group in group_items:
-                    platform_bot_id, item_bot_self_id = _resolve_group_target_ids(group)
-                    await gss.active_bot[ws_bot_id].target_send(
-                        group["messages"],
-                        "group",
-                        gid,
-                        platform_bot_id,
-                        item_bot_self_id or bot_self_id,
-                        "",
+class BoardcastOutboxSender:
+    """发件箱后台发送器
+
+    循环取出到期的消息交给分发器投递，成功的删除，失败的延后重试；
+    进程重启后从发件箱继续投递（至少投递一次）。
+    """
+
+    BATCH_SIZE = 500
+    # 成功记录累计到此数量时删除一次，缩小重启后的重复投递窗口
+    DELETE_BATCH = 20
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = 300
+    EXPIRE_SECONDS = 86400
+    IDLE_INTERVAL = 60
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    def start(self):
+        if self._stopped:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    def wakeup(self):
+        self.start()
+        self._wakeup.set()
+
+    async def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        task = self._task
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _loop(self):
+        while not self._stopped:
+            try:
+                await self.drain()
+                next_try_at = await RoverBoardcastOutbox.get_next_try_at()
+            except Exception as e:
+                logger.exception(f"[库洛签到·推送] 发件箱投递异常: {e}")
+                next_try_at = None
+
+            timeout = self.IDLE_INTERVAL
+            if next_try_at is not None:
+                timeout = min(max(next_try_at - int(time.time()), 1), timeout)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain(self):
+        """投递所有已到期的消息"""
+        dropped = await RoverBoardcastOutbox.drop_exhausted(
+            self.MAX_ATTEMPTS, int(time.time()) - self.EXPIRE_SECONDS
+        )
+        if dropped:
+            logger.warning(f"[库洛签到·推送] 发件箱丢弃 {dropped} 条多次失败或过期的消息")
+
+        while not self._stopped:
+            rows = await RoverBoardcastOutbox.get_due(self.BATCH_SIZE)
+            if not rows:
+                return
+
+            router = BotRouter()
+            dispatcher = BoardcastDispatcher.from_config("发件箱", router.send)
+            done_ids: List[int] = []
+
+            async def _on_result(job: BoardcastJob, ok: bool):
+                if ok and job.outbox_id is not None:
+                    done_ids.append(job.outbox_id)
+                    if len(done_ids) >= self.DELETE_BATCH:
+                        ids = done_ids[:]
+                        done_ids.clear()
+                        await RoverBoardcastOutbox.delete_by_ids(ids)
+
+            dispatcher.on_result = _on_result
+            for row in rows:
+                try:
+                    messages = load_messages(row.messages)
+                except Exception as e:
+                    logger.warning(f"[库洛签到·推送] 发件箱消息 {row.id} 无法解析，丢弃: {e}")
+                    done_ids.append(row.id)  # type: ignore
+                    continue
+                dispatcher.add(
+                    BoardcastJob(
+                        row.target_type,
+                        row.target_id,
+                        row.bot_id,
+                        row.bot_self_id,
+                        messages,
+                        outbox_id=row.id,
                     )
-                    await asyncio.sleep(0.5 + random.randint(1, 3))
-        except Exception as e:
-            logger.exception(f"[库洛签到·推送] 群 {gid} 推送失败!错误信息", e)
-        await asyncio.sleep(0.5 + random.randint(1, 3))
-    logger.info(f"[库洛签到·推送] {board_cast_type} 群聊推送完成!")
-    logger.info(f"[库洛签到·推送] {board_cast_type} 任务结束!")
+                )
+
+            async with EventLoopLagMonitor("发件箱推送"):
+                stats = await dispatcher.run()
+            router.log_summary("发件箱")
+            if done_ids:
+                await RoverBoardcastOutbox.delete_by_ids(done_ids)
+            failed_ids = [
+                job.outbox_id for job in stats.failed_jobs if job.outbox_id is not None
+            ]
+            if failed_ids:
+                await RoverBoardcastOutbox.postpone(
+                    failed_ids, int(time.time()) + self.RETRY_DELAY
+                )
+
+
+boardcast_outbox_sender = BoardcastOutboxSender()
+
+
+async def start_boardcast_outbox():
+    """启动发件箱发送器，继续投递重启前未完成的消息"""
+    pending = await RoverBoardcastOutbox.get_pending_count()
+    if pending:
+        logger.info(f"[库洛签到·推送] 发件箱中有 {pending} 条未投递的消息，继续投递")
+    boardcast_outbox_sender.wakeup()
+
+
+@on_core_shutdown
+async def _stop_outbox_sender():
+    await boardcast_outbox_sender.stop()
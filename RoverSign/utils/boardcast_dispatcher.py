@@ -0,0 +1,181 @@
+"""
+推送分发器
+
+按 (平台 bot_id, bot_self_id) 把待推送消息分到各自的队列，
+每个队列独立限速（令牌桶：速率 + 突发），不同 bot 的队列并发执行，
+发送失败按指数退避重试，并输出进度与总耗时。
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from gsuid_core.logger import logger
+
+from ..roversign_config.roversign_config import RoverSignConfig
+
+QueueKey = Tuple[str, str]
+
+
+@dataclass(slots=True)
+class BoardcastJob:
+    """一条待推送的消息"""
+
+    target_type: str  # direct / group
+    target_id: str
+    bot_id: str  # 平台 bot_id
+    bot_self_id: str
+    messages: Any
+    attempts: int = 0
+    outbox_id: Optional[int] = None
+
+
+@dataclass(slots=True)
+class BoardcastStats:
+    total: int = 0
+    success: int = 0
+    failed: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    failed_jobs: List[BoardcastJob] = field(default_factory=list)
+
+
+class TokenBucket:
+    """令牌桶限速：每秒补充 rate 个令牌，最多积攒 burst 个"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def get_dispatch_config() -> Tuple[float, int, int]:
+    """返回 (每秒速率, 突发条数, 最大重试次数)"""
+    per_minute = max(RoverSignConfig.get_config("BoardcastPerMinute").data, 1)
+    burst = max(RoverSignConfig.get_config("BoardcastBurst").data, 1)
+    retries = max(RoverSignConfig.get_config("BoardcastRetry").data, 0)
+    return per_minute / 60, burst, retries
+
+
+SendFunc = Callable[[BoardcastJob], Awaitable[None]]
+ResultFunc = Callable[[BoardcastJob, bool], Awaitable[None]]
+
+
+class BoardcastDispatcher:
+    """按 bot 分队列的并发推送分发器"""
+
+    BACKOFF_BASE = 2.0
+    BACKOFF_MAX = 30.0
+
+    def __init__(
+        self,
+        name: str,
+        send: SendFunc,
+        rate: float,
+        burst: int,
+        max_retries: int,
+    ):
+        self.name = name
+        self.send = send
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self._queues: Dict[QueueKey, Deque[BoardcastJob]] = {}
+        # 每条消息投递结束后的回调（成功 / 最终失败）
+        self.on_result: Optional[ResultFunc] = None
+        self.stats = BoardcastStats()
+        self._done = 0
+        self._next_report = 0
+
+    @classmethod
+    def from_config(cls, name: str, send: SendFunc) -> "BoardcastDispatcher":
+        rate, burst, retries = get_dispatch_config()
+        return cls(name, send, rate, burst, retries)
+
+    def add(self, job: BoardcastJob):
+        self._queues.setdefault((job.bot_id, job.bot_self_id), deque()).append(job)
+        self.stats.total += 1
+
+    def _report_progress(self):
+        self._done += 1
+        if self._done >= self._next_report or self._done == self.stats.total:
+            # 每完成约 10% 输出一次进度
+            self._next_report = self._done + max(self.stats.total // 10, 1)
+            logger.info(
+                f"[库洛签到·推送] {self.name} 进度 {self._done}/{self.stats.total}，"
+                f"失败 {self.stats.failed}"
+            )
+
+    async def _send_with_retry(self, job: BoardcastJob) -> bool:
+        while True:
+            job.attempts += 1
+            try:
+                await self.send(job)
+                return True
+            except Exception as e:
+                if job.attempts > self.max_retries:
+                    logger.warning(
+                        f"[库洛签到·推送] {job.target_type} {job.target_id} "
+                        f"推送失败（已重试 {job.attempts - 1} 次）: {e}"
+                    )
+                    return False
+                self.stats.retries += 1
+                delay = min(
+                    self.BACKOFF_BASE * 2 ** (job.attempts - 1), self.BACKOFF_MAX
+                ) + random.uniform(0, 1)
+                logger.debug(
+                    f"[库洛签到·推送] {job.target_type} {job.target_id} 推送失败，"
+                    f"{delay:.1f}s 后重试: {e}"
+                )
+                await asyncio.sleep(delay)
+
+    async def _worker(self, key: QueueKey, queue: Deque[BoardcastJob]):
+        bucket = TokenBucket(self.rate, self.burst)
+        while queue:
+            job = queue.popleft()
+            await bucket.acquire()
+            ok = await self._send_with_retry(job)
+            if ok:
+                self.stats.success += 1
+            else:
+                self.stats.failed += 1
+                self.stats.failed_jobs.append(job)
+            if self.on_result is not None:
+                try:
+                    await self.on_result(job, ok)
+                except Exception as e:
+                    logger.warning(f"[库洛签到·推送] 投递结果回调异常: {e}")
+            self._report_progress()
+
+    async def run(self) -> BoardcastStats:
+        """并发执行所有队列，返回统计信息"""
+        if not self.stats.total:
+            return self.stats
+        start = time.perf_counter()
+        logger.info(
+            f"[库洛签到·推送] {self.name} 共 {self.stats.total} 条，"
+            f"{len(self._queues)} 个bot队列，每队列 {self.rate * 60:.0f} 条/分钟，突发 {self.burst}"
+        )
+        await asyncio.gather(
+            *(self._worker(key, queue) for key, queue in self._queues.items())
+        )
+        self.stats.seconds = time.perf_counter() - start
+        logger.info(
+            f"[库洛签到·推送] {self.name} 推送结束：成功 {self.stats.success}，"
+            f"失败 {self.stats.failed}，重试 {self.stats.retries} 次，"
+            f"总耗时 {self.stats.seconds:.1f}s"
+        )
+        return self.stats
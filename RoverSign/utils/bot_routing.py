@@ -0,0 +1,96 @@
+"""
+推送路由
+
+gss.active_bot 以 WS 连接为键，一个连接可能承载多个平台 / 机器人账号。
+这里记录每个 (平台 bot_id, bot_self_id) 最近一次收发消息所在的 WS 连接，
+推送时每条消息只从拥有该账号的连接发送一次；
+只有所属连接离线或尚未记录时才回退为尝试所有在线连接。
+路由只保存在内存中：重启后尚未收发过消息的账号，首次推送仍会回退为全连接发送。
+"""
+from typing import Dict, List, Tuple
+
+from gsuid_core.gss import gss
+from gsuid_core.logger import logger
+
+RouteKey = Tuple[str, str]
+
+# (平台 bot_id, bot_self_id) -> WS 连接 ID
+_route_owner: Dict[RouteKey, str] = {}
+
+
+def record_bot_route(bot) -> None:
+    """从 Bot 实例记录账号所属的 WS 连接（O(1)，可在热路径调用）"""
+    ws_bot = getattr(bot, "bot", None)
+    ws_bot_id = getattr(ws_bot, "bot_id", None)
+    if not ws_bot_id:
+        return
+    ev = getattr(bot, "ev", None)
+    bot_id = getattr(ev, "real_bot_id", None) or getattr(bot, "bot_id", "")
+    bot_self_id = getattr(ev, "bot_self_id", None) or getattr(bot, "bot_self_id", "")
+    if not bot_id or not bot_self_id:
+        return
+    key = (bot_id, bot_self_id)
+    if _route_owner.get(key) != ws_bot_id:
+        _route_owner[key] = ws_bot_id
+
+
+class BotRouter:
+    """一次推送使用的路由快照"""
+
+    def __init__(self):
+        self.active = dict(gss.active_bot)
+        self.routes: Dict[RouteKey, str] = {
+            key: ws_bot_id
+            for key, ws_bot_id in _route_owner.items()
+            if ws_bot_id in self.active
+        }
+        self.fallbacks = 0
+
+    def resolve(self, bot_id: str, bot_self_id: str) -> List[str]:
+        """返回应使用的 WS 连接 ID 列表（通常只有一个）"""
+        active = gss.active_bot
+        ws_bot_id = self.routes.get((bot_id, bot_self_id))
+        if ws_bot_id and ws_bot_id in active:
+            return [ws_bot_id]
+        if bot_id in active:
+            # WS 连接 ID 与平台同名（常见单平台部署）
+            return [bot_id]
+        if len(active) <= 1:
+            return list(active)
+        # 所属连接离线或未知
+        self.fallbacks += 1
+        return list(active)
+
+    async def send(self, job) -> None:
+        """通过所属连接发送一条推送，失败时抛出异常交给分发器重试"""
+        ws_bot_ids = self.resolve(job.bot_id, job.bot_self_id)
+        if not ws_bot_ids:
+            raise RuntimeError("当前没有在线的 bot 连接")
+
+        # 回退时与旧逻辑一致：发往所有在线连接，全部失败才算失败
+        error = None
+        sent = False
+        for ws_bot_id in ws_bot_ids:
+            bot = gss.active_bot.get(ws_bot_id)
+            if bot is None:
+                continue
+            try:
+                await bot.target_send(
+                    job.messages,
+                    job.target_type,
+                    job.target_id,
+                    job.bot_id,
+                    job.bot_self_id,
+                    "",
+                )
+                sent = True
+            except Exception as e:
+                error = e
+        if not sent:
+            raise error or RuntimeError(f"bot 连接 {ws_bot_ids} 已离线")
+
+    def log_summary(self, name: str):
+        logger.info(
+            f"[库洛签到·推送] {name} 路由：在线连接 {len(self.active)} 个，"
+            f"已知账号路由 {len(self.routes)} 条，回退全连接发送 {self.fallbacks} 次"
+        )
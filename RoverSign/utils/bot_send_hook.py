@@ -1,23 +1,60 @@
+import asyncio
 import inspect
 import sys
+import time
 from typing import Callable, Optional
 
 from gsuid_core.bot import Bot
 from gsuid_core.logger import logger
 
+from .bot_routing import record_bot_route
+
 
 if not hasattr(sys, '_gs_bot_hook_managers'):
     sys._gs_bot_hook_managers = {}
 _plugin_hook_managers = sys._gs_bot_hook_managers
 
 
+# 后台执行 hook 的并发上限；排队任务过多时退回到在发送前直接执行（背压）
+_HOOK_CONCURRENCY = 8
+_MAX_PENDING_HOOK_TASKS = 1000
+_SLOW_HOOK_MS = 1000
+
+_hook_semaphore = asyncio.Semaphore(_HOOK_CONCURRENCY)
+_pending_hook_tasks: set[asyncio.Task] = set()
+# hook 名称 -> [调用次数, 总耗时ms, 最大耗时ms]
+hook_stats: dict[str, list] = {}
+# 其它插件的管理器没有分发表时，按 hook 缓存参数个数
+_arity_cache: dict[Callable, int] = {}
+
+
+def _hook_arity(hook: Callable) -> int:
+    try:
+        return len(inspect.signature(hook).parameters)
+    except (TypeError, ValueError):
+        return 3
+
+
+def _cached_arity(hook: Callable) -> int:
+    arity = _arity_cache.get(hook)
+    if arity is None:
+        arity = _arity_cache[hook] = _hook_arity(hook)
+    return arity
+
+
 class PluginHookManager:
-    """插件 hook 管理器"""
+    """插件 hook 管理器
+
+    注册时即解析 hook 的参数个数，生成分发表，调用时不再反射
+    """
 
     def __init__(self, plugin_name: str):
         self.plugin_name = plugin_name
         self.target_send_hooks: list[Callable] = []
         self.user_activity_hooks: list[Callable] = []
+        # (hook, 参数个数) 分发表
+        self.target_send_dispatch: list[tuple[Callable, int]] = []
+        self.user_activity_dispatch: list[tuple[Callable, int]] = []
 
     def register_target_send_hook(self, func: Callable):
         """注册 target_send 方法 hook"""
@@ -28,6 +65,7 @@ class PluginHookManager:
         else:
             logger.debug(f"[库洛签到·BotHook] 注册 target_send hook: {func.__name__}")
         self.target_send_hooks.append(func)
+        self.target_send_dispatch = [(h, _cached_arity(h)) for h in self.target_send_hooks]
 
     def register_user_activity_hook(self, func: Callable):
         """注册用户活跃度 hook"""
@@ -38,6 +76,7 @@ class PluginHookManager:
         else:
             logger.debug(f"[库洛签到·BotHook] 注册 user_activity hook: {func.__name__}")
         self.user_activity_hooks.append(func)
+        self.user_activity_dispatch = [(h, _cached_arity(h)) for h in self.user_activity_hooks]
 
 
 def get_or_create_hook_manager(plugin_name: str) -> PluginHookManager:
@@ -53,13 +92,6 @@ def get_or_create_hook_manager(plugin_name: str) -> PluginHookManager:
 _rs_manager = get_or_create_hook_manager("RS")
 
 
-def _hook_arity(hook: Callable) -> int:
-    try:
-        return len(inspect.signature(hook).parameters)
-    except (TypeError, ValueError):
-        return 3
-
-
 def register_target_send_hook(func: Callable):
     """注册 target_send 方法 hook"""
     _rs_manager.register_target_send_hook(func)
@@ -70,6 +102,62 @@ def register_user_activity_hook(func: Callable):
     _rs_manager.register_user_activity_hook(func)
 
 
+def _get_dispatch(manager, kind: str) -> list[tuple[Callable, int]]:
+    """读取管理器的分发表；其它插件创建的旧版管理器没有分发表，按 hook 列表现算"""
+    dispatch = getattr(manager, f"{kind}_dispatch", None)
+    hooks = getattr(manager, f"{kind}_hooks", [])
+    if dispatch is not None and len(dispatch) == len(hooks):
+        return dispatch
+    return [(h, _cached_arity(h)) for h in hooks]
+
+
+async def _run_hook(hook: Callable, args: tuple, kind: str):
+    """执行单个 hook 并记录耗时"""
+    name = getattr(hook, "__qualname__", getattr(hook, "__name__", repr(hook)))
+    async with _hook_semaphore:
+        start = time.perf_counter()
+        try:
+            await hook(*args)
+        except Exception as e:
+            logger.warning(f"[库洛签到·BotHook] {kind} hook {name} 执行失败: {e}")
+        cost_ms = (time.perf_counter() - start) * 1000
+    stat = hook_stats.setdefault(name, [0, 0.0, 0.0])
+    stat[0] += 1
+    stat[1] += cost_ms
+    stat[2] = max(stat[2], cost_ms)
+    if cost_ms >= _SLOW_HOOK_MS:
+        logger.warning(f"[库洛签到·BotHook] {kind} hook {name} 执行较慢: {cost_ms:.0f}ms")
+
+
+async def _dispatch(kind: str, args_by_arity: Callable[[int], tuple]):
+    """调用所有插件的某类 hooks
+
+    RoverSign 自己的 hooks 按 contextvar 判断来源，放到后台执行、不阻塞发送；
+    其它插件的 hooks 可能仍通过遍历调用栈判断来源，必须在发送方的调用栈内直接执行
+    """
+    for manager in list(_plugin_hook_managers.values()):
+        background = manager is _rs_manager
+        for hook, arity in _get_dispatch(manager, kind):
+            coro = _run_hook(hook, args_by_arity(arity), kind)
+            if not background or len(_pending_hook_tasks) >= _MAX_PENDING_HOOK_TASKS:
+                await coro
+                continue
+            task = asyncio.create_task(coro)
+            _pending_hook_tasks.add(task)
+            task.add_done_callback(_pending_hook_tasks.discard)
+
+
+def get_hook_stats_summary(limit: int = 3) -> str:
+    """按平均耗时列出最慢的几个 hook，用于状态页"""
+    if not hook_stats:
+        return "暂无"
+    slowest = sorted(hook_stats.items(), key=lambda kv: kv[1][1] / kv[1][0], reverse=True)
+    return "，".join(
+        f"{name.rsplit('.', 1)[-1]} 平均{total / count:.1f}ms/最大{max_ms:.0f}ms"
+        for name, (count, total, max_ms) in slowest[:limit]
+    )
+
+
 async def _call_all_target_send_hooks(
     target_type: str,
     target_id: Optional[str],
@@ -81,21 +169,10 @@ async def _call_all_target_send_hooks(
     if not group_id:
         return
 
-    for plugin_name, manager in _plugin_hook_managers.items():
-        if not manager.target_send_hooks:
-            continue
-
-        logger.debug(f"[库洛签到·BotHook] 调用 {len(manager.target_send_hooks)} 个 target_send hooks, group_id={group_id}")
-
-        for hook in manager.target_send_hooks:
-            try:
-                logger.debug(f"[库洛签到·BotHook] 执行 hook: {hook.__name__}, group_id={group_id}")
-                if _hook_arity(hook) >= 3:
-                    await hook(group_id, bot_id, bot_self_id)
-                else:
-                    await hook(group_id, bot_self_id)
-            except Exception as e:
-                logger.warning(f"[库洛签到·BotHook] target_send hook {hook.__name__} 执行失败: {e}")
+    await _dispatch(
+        "target_send",
+        lambda arity: (group_id, bot_id, bot_self_id) if arity >= 3 else (group_id, bot_self_id),
+    )
 
 
 async def _call_all_user_activity_hooks(user_id: Optional[str], bot_id: str, bot_self_id: str):
@@ -103,25 +180,10 @@ async def _call_all_user_activity_hooks(user_id: Optional[str], bot_id: str, bot
     if not user_id:
         return
 
-    logger.debug(f"[库洛签到·BotHook] 当前已注册的插件管理器: {list(_plugin_hook_managers.keys())}")
-
-    for plugin_name, manager in _plugin_hook_managers.items():
-        logger.debug(f"[库洛签到·BotHook] 插件 {plugin_name} 有 {len(manager.user_activity_hooks)} 个 user_activity_hooks")
-
-        if not manager.user_activity_hooks:
-            continue
-
-        logger.debug(f"[库洛签到·BotHook] 调用 {len(manager.user_activity_hooks)} 个 user_activity hooks, user_id={user_id}")
-
-        for hook in manager.user_activity_hooks:
-            try:
-                logger.debug(f"[库洛签到·BotHook] 执行 hook: {hook.__name__}, user_id={user_id}")
-                try:
-                    await hook(user_id, bot_id, bot_self_id)
-                except TypeError:
-                    await hook(user_id, bot_id)
-            except Exception as e:
-                logger.warning(f"[库洛签到·BotHook] user_activity hook {hook.__name__} 执行失败: {e}")
+    await _dispatch(
+        "user_activity",
+        lambda arity: (user_id, bot_id, bot_self_id) if arity >= 3 else (user_id, bot_id),
+    )
 
 
 def install_bot_hooks():
@@ -138,12 +200,14 @@ def install_bot_hooks():
 
     # 包装 send 方法
     async def hooked_send(self, *args, **kwargs):
+        record_bot_route(self)
+
         # 调用 hooks
         user_id = getattr(self.ev, "user_id", None) if hasattr(self, "ev") else None
         bot_id = getattr(self, "bot_id", "") if hasattr(self, "bot_id") else ""
         bot_self_id = getattr(self, "bot_self_id", "") if hasattr(self, "bot_self_id") else ""
 
-        # 调用所有插件的用户活跃度 hooks
+        # 调用所有插件的用户活跃度 hooks（RoverSign 的在后台执行，不阻塞发送）
         await _call_all_user_activity_hooks(user_id, bot_id, bot_self_id)
 
         # 调用所有插件的 target_send hooks (群组消息时更新群组绑定)
@@ -1,8 +1,10 @@
-from typing import Any, Dict, List, Type, TypeVar, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple, Type, Union, TypeVar, Optional, AsyncIterator
 
 from sqlmodel import Field, col, select
-from sqlalchemy import null, delete, update
+from sqlalchemy import func, null, delete, update, and_, or_, UniqueConstraint
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from pydantic import BaseModel as PydanticBaseModel
 from gsuid_core.utils.database.startup import exec_list
 from gsuid_core.webconsole.mount_app import PageSchema, GsAdminModel, site
@@ -10,11 +12,14 @@ from gsuid_core.utils.database.base_models import (
     Bind,
     User,
     BaseIDModel,
+    async_maker,
     with_session,
 )
 
 from ..util import get_today_date
 from ._lock import with_lock
+from .sign_buffer import sign_write_buffer
+from .sign_mirror import SignState, today_sign_mirror
 from .rover_user_activity import RoverUserActivity
 from .rover_subscribe import RoverSubscribe
 
@@ -25,10 +30,46 @@ exec_list.extend(
         "ALTER TABLE WavesUser ADD COLUMN is_login INTEGER DEFAULT 0 NOT NULL",
         "ALTER TABLE WavesUser ADD COLUMN created_time INTEGER",
         "ALTER TABLE WavesUser ADD COLUMN last_used_time INTEGER",
+        # RoverSign (uid, date) 唯一：先把重复行的签到状态合并到最新一行，再删除其余行
+        "UPDATE RoverSign SET "
+        "game_sign = (SELECT MAX(r.game_sign) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date), "
+        "pgr_game_sign = (SELECT MAX(r.pgr_game_sign) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date), "
+        "bbs_sign = (SELECT MAX(r.bbs_sign) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date), "
+        "bbs_detail = (SELECT MAX(r.bbs_detail) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date), "
+        "bbs_like = (SELECT MAX(r.bbs_like) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date), "
+        "bbs_share = (SELECT MAX(r.bbs_share) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date), "
+        "pgr_uid = COALESCE(NULLIF(pgr_uid, ''), (SELECT MAX(r.pgr_uid) FROM RoverSign r "
+        "WHERE r.uid = RoverSign.uid AND r.date = RoverSign.date)) "
+        "WHERE id IN (SELECT MAX(id) FROM RoverSign GROUP BY uid, date HAVING COUNT(*) > 1)",
+        "DELETE FROM RoverSign WHERE id NOT IN "
+        "(SELECT MAX(id) FROM RoverSign GROUP BY uid, date)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_RoverSign_uid_date ON RoverSign (uid, date)",
+        "DROP INDEX IF EXISTS ix_RoverSign_uid_date",
+        # 热点查询索引（IF NOT EXISTS 保证重复启动幂等）
+        "CREATE INDEX IF NOT EXISTS ix_RoverSign_date ON RoverSign (date)",
+        "CREATE INDEX IF NOT EXISTS ix_WavesUser_cookie_uid_game_id "
+        "ON WavesUser (cookie, uid, game_id)",
+        "CREATE INDEX IF NOT EXISTS ix_WavesUser_user_id_uid_bot_id_game_id "
+        "ON WavesUser (user_id, uid, bot_id, game_id)",
+        "CREATE INDEX IF NOT EXISTS ix_WavesUser_last_used_time "
+        "ON WavesUser (last_used_time)",
     ]
 )
 
 
+# 最后使用时间只用于按天判断活跃度，短时间内的重复更新跳过
+LAST_USED_SKIP_SECONDS = 3600
+_LAST_USED_CACHE_SIZE = 10000
+# (user_id, bot_id, uid, game_id) -> 上次写入时间
+_last_used_updated: Dict[Tuple[str, str, str, Optional[int]], float] = {}
+
+
 T_WavesBind = TypeVar("T_WavesBind", bound="WavesBind")
 T_WavesUser = TypeVar("T_WavesUser", bound="WavesUser")
 T_RoverSign = TypeVar("T_RoverSign", bound="RoverSign")
@@ -40,6 +81,23 @@ class WavesBind(Bind, table=True):
     pgr_uid: Optional[str] = Field(default=None, title="战双UID")
 
 
+@dataclass(slots=True)
+class WavesUserRecord:
+    """签到流程使用的精简账号记录（只包含签到需要的列）"""
+
+    uid: str
+    user_id: str
+    bot_id: str
+    cookie: str
+    did: str
+    bat: str
+    game_id: int
+    sign_switch: str
+    bbs_sign_switch: str
+    status: Optional[str]
+    last_used_time: Optional[int]
+
+
 class WavesUser(User, table=True):
     __table_args__: Dict[str, Any] = {"extend_existing": True}
     cookie: str = Field(default="", title="Cookie")
@@ -148,6 +206,64 @@ class WavesUser(User, table=True):
         data = result.scalars().all()
         return list(data)
 
+    @classmethod
+    async def iter_sign_users(
+        cls: Type[T_WavesUser],
+        active_days: Optional[int] = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[WavesUserRecord]:
+        """
+        流式遍历有cookie的玩家，只查询签到需要的列
+
+        Args:
+            active_days: 仅返回指定天数内有使用记录的玩家，None 表示全部
+            chunk_size: 每次从数据库游标取出的行数
+        """
+        import time
+
+        columns = [getattr(cls, name) for name in WavesUserRecord.__slots__]
+        sql = (
+            select(*columns)
+            .where(cls.cookie != null())
+            .where(cls.cookie != "")
+            .where(cls.user_id != null())
+            .where(cls.user_id != "")
+        )
+        if active_days is not None:
+            threshold_time = int(time.time()) - (active_days * 24 * 60 * 60)
+            sql = sql.where(cls.last_used_time != null()).where(
+                cls.last_used_time >= threshold_time
+            )
+
+        async with async_maker() as session:
+            result = await session.stream(
+                sql.execution_options(yield_per=chunk_size)
+            )
+            async for rows in result.partitions(chunk_size):
+                for row in rows:
+                    yield WavesUserRecord(*row)
+
+    @classmethod
+    @with_session
+    async def get_sign_user_count(
+        cls: Type[T_WavesUser],
+        session: AsyncSession,
+    ) -> int:
+        """
+        统计开启了自动签到的有cookie玩家数量
+        """
+        sql = (
+            select(func.count())
+            .select_from(cls)
+            .where(cls.cookie != null())
+            .where(cls.cookie != "")
+            .where(cls.user_id != null())
+            .where(cls.user_id != "")
+            .where(cls.sign_switch != "off")
+        )
+        result = await session.execute(sql)
+        return result.scalar_one()
+
     @classmethod
     @with_session
     async def select_data_by_cookie_and_uid(
@@ -200,54 +316,99 @@ class WavesUser(User, table=True):
         return list(data)
 
     @classmethod
-    @with_lock
-    @with_session
     async def update_last_used_time(
         cls,
-        session: AsyncSession,
         uid: str,
         user_id: str,
         bot_id: str,
         game_id: Optional[int] = None,
-    ):
+    ) -> bool:
         """更新最后使用时间，如果创建时间为空则同时设置创建时间
 
-        会更新所有具有相同 uid 和 cookie 的记录
+        会更新所有具有相同 user_id 和 cookie 的记录
         """
-        import time
+        return await cls.batch_update_last_used_time(user_id, bot_id, [(uid, game_id)])
 
-        current_time = int(time.time())
+    @classmethod
+    async def batch_update_last_used_time(
+        cls,
+        user_id: str,
+        bot_id: str,
+        uid_list: List[Tuple[str, Optional[int]]],
+    ) -> bool:
+        """一次更新同一用户多个 (uid, game_id) 的最后使用时间
 
-        # 先查询当前用户获取 cookie
-        filters = [
-            cls.user_id == user_id,
-            cls.uid == uid,
-            cls.bot_id == bot_id,
+        活跃度按天判断，LAST_USED_SKIP_SECONDS 内重复的更新直接跳过
+        """
+        import time
+
+        now = time.time()
+        pending = [
+            item
+            for item in uid_list
+            if now - _last_used_updated.get((user_id, bot_id, *item), 0)
+            >= LAST_USED_SKIP_SECONDS
         ]
-        if game_id is not None:
-            filters.append(cls.game_id == game_id)
+        if not pending:
+            return True
 
-        result = await session.execute(select(cls).where(*filters))
-        user = result.scalars().first()
+        updated = await cls._do_batch_update_last_used_time(
+            user_id, bot_id, pending, int(now)
+        )
+        if updated:
+            if len(_last_used_updated) >= _LAST_USED_CACHE_SIZE:
+                _last_used_updated.clear()
+            for item in pending:
+                _last_used_updated[(user_id, bot_id, *item)] = now
+        return updated
 
-        if user and user.cookie:
-            # 更新所有具有相同 user_id 和 cookie 的记录
-            all_users_result = await session.execute(
-                select(cls).where(
-                    cls.user_id == user_id,
-                    cls.cookie == user.cookie,
-                )
+    @classmethod
+    @with_lock
+    @with_session
+    async def _do_batch_update_last_used_time(
+        cls,
+        session: AsyncSession,
+        user_id: str,
+        bot_id: str,
+        uid_list: List[Tuple[str, Optional[int]]],
+        current_time: int,
+    ) -> bool:
+        uid_filters = [
+            and_(cls.uid == uid, cls.game_id == game_id)
+            if game_id is not None
+            else cls.uid == uid
+            for uid, game_id in uid_list
+        ]
+        # 查出这些 uid 的 cookie，更新所有具有相同 user_id 和 cookie 的记录
+        cookie_sql = select(cls.cookie).where(
+            cls.user_id == user_id,
+            cls.bot_id == bot_id,
+            cls.cookie != null(),
+            cls.cookie != "",
+            or_(*uid_filters),
+        )
+        sql = (
+            update(cls)
+            .where(col(cls.user_id) == user_id)
+            .where(col(cls.cookie).in_(cookie_sql))
+            .values(
+                last_used_time=current_time,
+                created_time=func.coalesce(cls.created_time, current_time),
             )
-            all_users = all_users_result.scalars().all()
+        )
+        result = await session.execute(sql)
+        return result.rowcount > 0
 
-            # 批量更新
-            for u in all_users:
-                u.last_used_time = current_time
-                if u.created_time is None:
-                    u.created_time = current_time
 
-            return True
-        return False
+# RoverSign 中记录签到进度的字段
+SIGN_FIELDS = (
+    "game_sign",
+    "pgr_game_sign",
+    "bbs_sign",
+    "bbs_detail",
+    "bbs_like",
+    "bbs_share",
+)
 
 
 class RoverSignData(PydanticBaseModel):
@@ -289,7 +450,11 @@ class RoverSignData(PydanticBaseModel):
 
 
 class RoverSign(BaseIDModel, table=True):
-    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    # upsert 依赖 (uid, date) 唯一约束：新库由 create_all 建立，旧库由 exec_list 去重后补建索引
+    __table_args__ = (
+        UniqueConstraint("uid", "date", name="uq_RoverSign_uid_date"),
+        {"extend_existing": True},
+    )
     uid: str = Field(title="鸣潮UID")
     pgr_uid: Optional[str] = Field(default=None, title="战双UID")
     game_sign: int = Field(default=0, title="游戏签到（鸣潮）")
@@ -313,86 +478,164 @@ class RoverSign(BaseIDModel, table=True):
         return result.scalars().first()
 
     @classmethod
-    @with_lock
-    @with_session
+    def _build_upsert_stmt(cls, rover_sign_data: RoverSignData):
+        """构造单条 INSERT ... ON CONFLICT(uid, date) DO UPDATE，只合并非空字段"""
+        values: Dict[str, Any] = {
+            "uid": rover_sign_data.uid,
+            "date": rover_sign_data.date,
+            "pgr_uid": rover_sign_data.pgr_uid,
+        }
+        update_fields: List[str] = []
+        for field in SIGN_FIELDS:
+            value = getattr(rover_sign_data, field)
+            # 新行的未指定字段按表默认值 0 写入
+            values[field] = value if value is not None else 0
+            if value is not None:
+                update_fields.append(field)
+        # 更新 pgr_uid
+        if rover_sign_data.pgr_uid:
+            update_fields.append("pgr_uid")
+
+        stmt = sqlite_insert(cls).values(**values)
+        if update_fields:
+            return stmt.on_conflict_do_update(
+                index_elements=["uid", "date"],
+                set_={field: getattr(stmt.excluded, field) for field in update_fields},
+            )
+        return stmt.on_conflict_do_nothing(index_elements=["uid", "date"])
+
+    @classmethod
     async def upsert_rover_sign(
         cls: Type[T_RoverSign],
-        session: AsyncSession,
         rover_sign_data: RoverSignData,
-    ) -> Optional[T_RoverSign]:
+    ) -> bool:
         """
         插入或更新签到数据
-        返回更新后的记录或新插入的记录
+
+        签到任务执行期间写入合并缓冲区，由后台批量刷写；
+        否则直接执行单条 UPSERT，并发写入同一 uid/date 也不会产生重复行
         """
         if not rover_sign_data.uid:
-            return None
+            return False
 
         # 确保日期有值
         rover_sign_data.date = rover_sign_data.date or get_today_date()
 
-        # 查询是否存在记录
-        record = await cls._find_sign_record(
-            session, rover_sign_data.uid, rover_sign_data.date
-        )
-
-        if record:
-            # 更新已有记录
-            for field in [
-                "game_sign",
-                "pgr_game_sign",
-                "bbs_sign",
-                "bbs_detail",
-                "bbs_like",
-                "bbs_share",
-            ]:
-                value = getattr(rover_sign_data, field)
-                if value is not None:
-                    setattr(record, field, value)
-            # 更新 pgr_uid
-            if rover_sign_data.pgr_uid:
-                record.pgr_uid = rover_sign_data.pgr_uid
-            result = record
-        else:
-            # 添加新记录 - 直接从Pydantic模型创建SQLModel实例
-            result = cls(**rover_sign_data.model_dump())
-            session.add(result)
-
+        if sign_write_buffer.active:
+            sign_write_buffer.put(rover_sign_data)
+            today_sign_mirror.apply(rover_sign_data)
+            return True
+        result = await cls._do_upsert_rover_sign(rover_sign_data)
+        today_sign_mirror.apply(rover_sign_data)
         return result
 
     @classmethod
+    @with_lock
+    @with_session
+    async def _do_upsert_rover_sign(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        rover_sign_data: RoverSignData,
+    ) -> bool:
+        await session.execute(cls._build_upsert_stmt(rover_sign_data))
+        return True
+
+    @classmethod
+    @with_lock
     @with_session
-    async def get_sign_data(
+    async def batch_upsert_rover_sign(
         cls: Type[T_RoverSign],
         session: AsyncSession,
+        rover_sign_datas: List[RoverSignData],
+    ) -> int:
+        """在同一个事务内批量写入签到数据，返回写入条数"""
+        for rover_sign_data in rover_sign_datas:
+            await session.execute(cls._build_upsert_stmt(rover_sign_data))
+        return len(rover_sign_datas)
+
+    @classmethod
+    async def get_sign_data(
+        cls: Type[T_RoverSign],
         uid: str,
         date: Optional[str] = None,
-    ) -> Optional[T_RoverSign]:
-        """根据UID和日期查询签到数据"""
+    ) -> Optional[Union[T_RoverSign, SignState]]:
+        """根据UID和日期查询签到数据
+
+        今日数据直接读取内存镜像；其他日期查库并叠加缓冲区中尚未落库的状态
+        """
         date = date or get_today_date()
-        return await cls._find_sign_record(session, uid, date)
+        if date == get_today_date() and await today_sign_mirror.ensure_loaded():
+            return today_sign_mirror.get(uid)
+        record = await cls._do_get_sign_data(uid, date)
+        return sign_write_buffer.overlay(cls, uid, date, record)
 
     @classmethod
     @with_session
-    async def get_all_sign_data_by_date(
+    async def _do_get_sign_data(
         cls: Type[T_RoverSign],
         session: AsyncSession,
+        uid: str,
+        date: str,
+    ) -> Optional[T_RoverSign]:
+        return await cls._find_sign_record(session, uid, date)
+
+    @classmethod
+    async def get_all_sign_data_by_date(
+        cls: Type[T_RoverSign],
         date: Optional[str] = None,
     ) -> List[T_RoverSign]:
         """根据日期查询所有签到数据"""
-        actual_date = date or get_today_date()
-        sql = select(cls).where(cls.date == actual_date)
+        await sign_write_buffer.flush()
+        return await cls._do_get_all_sign_data_by_date(date or get_today_date())
+
+    @classmethod
+    @with_session
+    async def _do_get_all_sign_data_by_date(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        date: str,
+    ) -> List[T_RoverSign]:
+        sql = select(cls).where(cls.date == date)
         result = await session.execute(sql)
         return list(result.scalars().all())
 
     @classmethod
-    @with_lock
+    async def get_sign_count_by_date(
+        cls: Type[T_RoverSign],
+        date: Optional[str] = None,
+    ) -> int:
+        """根据日期统计签到记录数量"""
+        await sign_write_buffer.flush()
+        return await cls._do_get_sign_count_by_date(date or get_today_date())
+
+    @classmethod
     @with_session
-    async def clear_sign_record(
+    async def _do_get_sign_count_by_date(
         cls: Type[T_RoverSign],
         session: AsyncSession,
         date: str,
+    ) -> int:
+        sql = select(func.count()).select_from(cls).where(cls.date == date)
+        result = await session.execute(sql)
+        return result.scalar_one()
+
+    @classmethod
+    async def clear_sign_record(
+        cls: Type[T_RoverSign],
+        date: str,
     ):
         """清除签到记录"""
+        await sign_write_buffer.flush()
+        await cls._do_clear_sign_record(date)
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def _do_clear_sign_record(
+        cls: Type[T_RoverSign],
+        session: AsyncSession,
+        date: str,
+    ):
         sql = delete(cls).where(getattr(cls, "date") <= date)
         await session.execute(sql)
 
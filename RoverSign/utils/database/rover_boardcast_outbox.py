@@ -0,0 +1,160 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar
+
+from sqlmodel import Field, col, select
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.utils.database.startup import exec_list
+from gsuid_core.utils.database.base_models import BaseIDModel, with_session
+
+from ._lock import with_lock
+
+exec_list.extend(
+    [
+        "CREATE INDEX IF NOT EXISTS ix_RoverBoardcastOutbox_next_try_at "
+        "ON RoverBoardcastOutbox (next_try_at)",
+    ]
+)
+
+T_RoverBoardcastOutbox = TypeVar("T_RoverBoardcastOutbox", bound="RoverBoardcastOutbox")
+
+
+def dump_messages(messages: Sequence[Any]) -> str:
+    """把 Message 列表压缩为 JSON 文本（图片在构造时已转为 base64 字符串）"""
+    return json.dumps(
+        [{"type": m.type, "data": m.data} for m in messages],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def load_messages(raw: str) -> List[Any]:
+    from gsuid_core.models import Message
+
+    return [Message(type=m["type"], data=m["data"]) for m in json.loads(raw)]
+
+
+class RoverBoardcastOutbox(BaseIDModel, table=True):
+    """签到报告推送发件箱
+
+    签到任务只负责把报告写入此表，由后台发送器逐条投递，
+    投递成功后删除；重启后未投递的消息会继续发送。
+    """
+
+    __tablename__ = "RoverBoardcastOutbox"
+    __table_args__: Dict[str, Any] = {"extend_existing": True}
+
+    task_name: str = Field(default="", title="订阅类型")
+    target_type: str = Field(default="", title="推送类型")  # direct / group
+    target_id: str = Field(default="", title="推送目标")
+    bot_id: str = Field(default="", title="平台")
+    bot_self_id: str = Field(default="", title="BotSelfID")
+    messages: str = Field(default="[]", title="消息内容")
+    attempts: int = Field(default=0, title="已投递次数")
+    created_at: int = Field(default=0, title="创建时间")
+    next_try_at: int = Field(default=0, title="下次投递时间")
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def enqueue(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+        rows: List[Dict[str, Any]],
+    ) -> int:
+        """在一个事务内写入多条待推送消息"""
+        if not rows:
+            return 0
+        now = int(time.time())
+        for row in rows:
+            row.setdefault("created_at", now)
+            row.setdefault("next_try_at", now)
+        await session.execute(insert(cls), rows)
+        return len(rows)
+
+    @classmethod
+    @with_session
+    async def get_due(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+        limit: int = 500,
+        now: Optional[int] = None,
+    ) -> List[T_RoverBoardcastOutbox]:
+        """获取已到投递时间的消息（按写入顺序）"""
+        now = now or int(time.time())
+        sql = (
+            select(cls)
+            .where(cls.next_try_at <= now)
+            .order_by(col(cls.id))
+            .limit(limit)
+        )
+        result = await session.execute(sql)
+        return list(result.scalars().all())
+
+    @classmethod
+    @with_session
+    async def get_next_try_at(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+    ) -> Optional[int]:
+        """最早的下次投递时间，发件箱为空时返回 None"""
+        result = await session.execute(select(func.min(cls.next_try_at)))
+        return result.scalar()
+
+    @classmethod
+    @with_session
+    async def get_pending_count(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+    ) -> int:
+        result = await session.execute(select(func.count()).select_from(cls))
+        return result.scalar() or 0
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def delete_by_ids(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+        ids: List[int],
+    ):
+        for i in range(0, len(ids), 500):
+            await session.execute(
+                delete(cls).where(col(cls.id).in_(ids[i : i + 500]))
+            )
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def postpone(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+        ids: List[int],
+        next_try_at: int,
+    ):
+        """投递失败的消息延后重试"""
+        for i in range(0, len(ids), 500):
+            await session.execute(
+                update(cls)
+                .where(col(cls.id).in_(ids[i : i + 500]))
+                .values(attempts=cls.attempts + 1, next_try_at=next_try_at)
+            )
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def drop_exhausted(
+        cls: Type[T_RoverBoardcastOutbox],
+        session: AsyncSession,
+        max_attempts: int,
+        expire_before: int,
+    ) -> int:
+        """丢弃超过重试次数或过期的消息"""
+        result = await session.execute(
+            delete(cls).where(
+                (cls.attempts >= max_attempts) | (cls.created_at < expire_before)
+            )
+        )
+        return result.rowcount or 0
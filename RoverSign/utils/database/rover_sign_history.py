@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Literal, Optional, Set, Tuple, Type, TypeVar
+
+from sqlmodel import Field, select
+from sqlalchemy import UniqueConstraint, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from gsuid_core.logger import logger
+from gsuid_core.utils.database.startup import exec_list
+from gsuid_core.utils.database.base_models import BaseIDModel, with_session
+
+from ._lock import with_lock
+from .models import RoverSign
+from .sign_buffer import sign_write_buffer
+from .states import SignStatus
+
+exec_list.extend(
+    [
+        "CREATE INDEX IF NOT EXISTS ix_RoverSignHistory_month "
+        "ON RoverSignHistory (month)",
+    ]
+)
+
+# 单条 INSERT 的行数上限（5 列 × 150 行，低于旧版 SQLite 999 个参数的限制）
+ARCHIVE_CHUNK_SIZE = 150
+
+T_RoverSignHistory = TypeVar("T_RoverSignHistory", bound="RoverSignHistory")
+
+SignKind = Literal["waves", "pgr", "bbs"]
+
+_BITS_FIELD: Dict[str, str] = {
+    "waves": "waves_bits",
+    "pgr": "pgr_bits",
+    "bbs": "bbs_bits",
+}
+
+
+# 最近一次归档的截止日期（含）；启动后尚未归档时按每日清理的截止日期（2 天前）估算
+_archived_through: Optional[str] = None
+
+
+def get_archived_through() -> datetime:
+    """已归档到的日期（含）"""
+    if _archived_through is not None:
+        return datetime.strptime(_archived_through, "%Y-%m-%d")
+    return (datetime.now() - timedelta(days=2)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _day_bit(date: datetime) -> int:
+    """当月第 N 天对应第 N-1 位"""
+    return 1 << (date.day - 1)
+
+
+class RoverSignHistory(BaseIDModel, table=True):
+    """签到历史月度位图表
+
+    每个 UID 每月一行，第 N 天的签到结果记录在对应字段的第 N-1 位。
+    RoverSign 每日明细在清理前归档到此表，热表保持很小。
+    """
+
+    __tablename__ = "RoverSignHistory"
+    __table_args__ = (
+        UniqueConstraint("uid", "month", name="uq_RoverSignHistory_uid_month"),
+        {"extend_existing": True},
+    )
+
+    uid: str = Field(default="", title="UID")
+    month: str = Field(default="", title="月份")  # YYYY-MM
+    waves_bits: int = Field(default=0, title="鸣潮签到位图")
+    pgr_bits: int = Field(default=0, title="战双签到位图")
+    bbs_bits: int = Field(default=0, title="社区签到位图")
+
+    @classmethod
+    async def archive_and_clear(
+        cls: Type[T_RoverSignHistory],
+        date: str,
+        bbs_tasks: Optional[Iterable[str]] = None,
+    ) -> int:
+        """把 date 及之前的签到明细归档为月度位图，然后删除明细
+
+        Returns:
+            int: 归档的明细条数
+        """
+        global _archived_through
+
+        await sign_write_buffer.flush()
+        num = await cls._do_archive_and_clear(
+            date, set(bbs_tasks) if bbs_tasks is not None else None
+        )
+        if _archived_through is None or date > _archived_through:
+            _archived_through = date
+        return num
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def _do_archive_and_clear(
+        cls: Type[T_RoverSignHistory],
+        session: AsyncSession,
+        date: str,
+        bbs_tasks: Optional[Set[str]],
+    ) -> int:
+        result = await session.execute(
+            select(RoverSign).where(RoverSign.date <= date)
+        )
+        records = result.scalars().all()
+        # 未配置库街区任务时不记录社区签到位（空任务集会被判定为全部完成）
+        archive_bbs = bbs_tasks is None or bool(bbs_tasks)
+
+        bitmaps: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for record in records:
+            try:
+                day = datetime.strptime(record.date, "%Y-%m-%d")
+            except (TypeError, ValueError):
+                continue
+            bit = _day_bit(day)
+            bits = bitmaps.setdefault(
+                (record.uid, day.strftime("%Y-%m")),
+                {"waves_bits": 0, "pgr_bits": 0, "bbs_bits": 0},
+            )
+            if SignStatus.waves_game_sign_complete(record):
+                bits["waves_bits"] |= bit
+            if SignStatus.pgr_game_sign_complete(record):
+                bits["pgr_bits"] |= bit
+            if archive_bbs and SignStatus.bbs_sign_complete(record, bbs_tasks):
+                bits["bbs_bits"] |= bit
+
+        rows = [
+            {"uid": uid, "month": month, **bits}
+            for (uid, month), bits in bitmaps.items()
+        ]
+        # 分批写入，同一事务内完成，避免超出 SQLite 绑定参数上限
+        for i in range(0, len(rows), ARCHIVE_CHUNK_SIZE):
+            stmt = sqlite_insert(cls).values(rows[i : i + ARCHIVE_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["uid", "month"],
+                set_={
+                    field: getattr(cls, field).op("|")(getattr(stmt.excluded, field))
+                    for field in _BITS_FIELD.values()
+                },
+            )
+            await session.execute(stmt)
+
+        await session.execute(delete(RoverSign).where(RoverSign.date <= date))
+        logger.debug(
+            f"[库洛签到·签到历史] 归档 {len(records)} 条签到明细，"
+            f"更新 {len(bitmaps)} 条月度位图"
+        )
+        return len(records)
+
+    @classmethod
+    @with_session
+    async def get_month_bits(
+        cls: Type[T_RoverSignHistory],
+        session: AsyncSession,
+        uid: str,
+        month: str,
+    ) -> Optional[T_RoverSignHistory]:
+        """获取 UID 某月的签到位图"""
+        sql = select(cls).where(cls.uid == uid, cls.month == month)
+        result = await session.execute(sql)
+        return result.scalars().first()
+
+    @classmethod
+    async def get_month_completion_rate(
+        cls: Type[T_RoverSignHistory],
+        uid: str,
+        month: str,
+        kind: SignKind = "waves",
+    ) -> float:
+        """获取 UID 某月已归档天数中的签到完成率"""
+        record = await cls.get_month_bits(uid, month)
+        if not record:
+            return 0.0
+        first_day = datetime.strptime(month, "%Y-%m")
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        # 只统计已归档的天数，尚在热表中的今天、昨天不计入分母
+        archived_end = get_archived_through() + timedelta(days=1)
+        days = (min(next_month, archived_end) - first_day).days
+        if days <= 0:
+            return 0.0
+        bits = getattr(record, _BITS_FIELD[kind])
+        return min(bin(bits).count("1") / days, 1.0)
+
+    @classmethod
+    @with_session
+    async def get_streak(
+        cls: Type[T_RoverSignHistory],
+        session: AsyncSession,
+        uid: str,
+        end_date: str,
+        kind: SignKind = "waves",
+    ) -> int:
+        """获取截至 end_date（含）的连续签到天数"""
+        sql = (
+            select(cls)
+            .where(cls.uid == uid, cls.month <= end_date[:7])
+            .order_by(cls.month.desc())  # type: ignore
+        )
+        result = await session.execute(sql)
+        months = {r.month: getattr(r, _BITS_FIELD[kind]) for r in result.scalars()}
+
+        streak = 0
+        day = datetime.strptime(end_date, "%Y-%m-%d")
+        while months.get(day.strftime("%Y-%m"), 0) & _day_bit(day):
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    @classmethod
+    @with_session
+    async def get_consecutive_failed_uids(
+        cls: Type[T_RoverSignHistory],
+        session: AsyncSession,
+        end_date: str,
+        days: int = 3,
+        kind: SignKind = "waves",
+    ) -> List[str]:
+        """获取截至 end_date（含）连续 days 天未完成签到的 UID"""
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        masks: Dict[str, int] = {}
+        for offset in range(days):
+            day = end - timedelta(days=offset)
+            month = day.strftime("%Y-%m")
+            masks[month] = masks.get(month, 0) | _day_bit(day)
+
+        field = getattr(cls, _BITS_FIELD[kind])
+        sql = select(cls.uid, cls.month, field).where(
+            cls.month.in_(list(masks.keys()))  # type: ignore
+        )
+        result = await session.execute(sql)
+
+        failed: Dict[str, bool] = {}
+        for uid, month, bits in result.all():
+            failed[uid] = failed.get(uid, True) and not (bits & masks[month])
+        return [uid for uid, is_failed in failed.items() if is_failed]
@@ -1,4 +1,5 @@
-from typing import Any, Dict, Optional, Type, TypeVar
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
 
 from sqlmodel import Field, col, select
 from sqlalchemy import update
@@ -6,14 +7,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from gsuid_core.logger import logger
 from gsuid_core.utils.database.base_models import BaseModel, with_session
 from gsuid_core.utils.database.models import Subscribe
 
+from ..subscribe_index import invalidate_subscribe_index
 from ._lock import with_lock
 
 T_RoverSubscribe = TypeVar("T_RoverSubscribe", bound="RoverSubscribe")
 T_WavesSubscribeReader = TypeVar("T_WavesSubscribeReader", bound="WavesSubscribeReader")
 
+# bot 未变化时 updated_at 的最短写库间隔（秒）
+UPDATED_AT_THROTTLE = 3600
+
+# IN 查询每批的群数量（SQLite 变量数上限）
+IN_QUERY_CHUNK = 500
+
+# group_id -> (bot_id, bot_self_id, updated_at)
+_group_bot_cache: Dict[str, Tuple[str, str, int]] = {}
+_group_bot_cache_loaded = False
+_group_bot_cache_lock = asyncio.Lock()
+
 
 class RoverSubscribe(BaseModel, table=True):
     """群组Bot记录表
@@ -30,17 +44,45 @@ class RoverSubscribe(BaseModel, table=True):
     updated_at: Optional[int] = Field(default=None, title="最后更新时间")
 
     @classmethod
-    @with_lock
+    async def load_group_bot_cache(cls: Type[T_RoverSubscribe], force: bool = False):
+        """从数据库加载 群组 -> (bot_id, bot_self_id) 内存映射"""
+        global _group_bot_cache_loaded
+
+        if _group_bot_cache_loaded and not force:
+            return
+        async with _group_bot_cache_lock:
+            if _group_bot_cache_loaded and not force:
+                return
+            records = await cls._get_all_group_bots()
+            _group_bot_cache.clear()
+            for record in records:
+                _group_bot_cache[record.group_id] = (
+                    record.bot_id,
+                    record.bot_self_id,
+                    record.updated_at or 0,
+                )
+            _group_bot_cache_loaded = True
+        logger.info(f"[库洛签到·订阅] 已加载 {len(_group_bot_cache)} 个群的bot记录")
+
+    @classmethod
     @with_session
-    async def check_and_update_bot(
+    async def _get_all_group_bots(
         cls: Type[T_RoverSubscribe],
         session: AsyncSession,
+    ) -> List[T_RoverSubscribe]:
+        result = await session.execute(select(cls))
+        return list(result.scalars().all())
+
+    @classmethod
+    async def check_and_update_bot(
+        cls: Type[T_RoverSubscribe],
         group_id: str,
         bot_id: str,
         bot_self_id: str,
     ) -> bool:
         """检查并更新群组的bot_self_id
 
+        先比对内存映射，只有bot发生变化或 updated_at 超过节流时间时才写库。
         如果bot_self_id发生变化，自动更新该群所有订阅的bot_self_id
 
         Args:
@@ -52,10 +94,39 @@ class RoverSubscribe(BaseModel, table=True):
             bool: 是否发生了bot变更
         """
         import time
-        from gsuid_core.logger import logger
+
+        await cls.load_group_bot_cache()
 
         current_time = int(time.time())
+        cached = _group_bot_cache.get(group_id)
+        if (
+            cached
+            and cached[0] == bot_id
+            and cached[1] == bot_self_id
+            and current_time - cached[2] < UPDATED_AT_THROTTLE
+        ):
+            return False
+
+        changed = await cls._do_check_and_update_bot(
+            group_id, bot_id, bot_self_id, current_time
+        )
+        _group_bot_cache[group_id] = (bot_id, bot_self_id, current_time)
+        if changed:
+            # 订阅表中的 bot_self_id 已更新
+            invalidate_subscribe_index()
+        return changed
 
+    @classmethod
+    @with_lock
+    @with_session
+    async def _do_check_and_update_bot(
+        cls: Type[T_RoverSubscribe],
+        session: AsyncSession,
+        group_id: str,
+        bot_id: str,
+        bot_self_id: str,
+        current_time: int,
+    ) -> bool:
         logger.debug(
             f"[库洛签到·订阅] check_and_update_bot 被调用: group_id={group_id}, bot_id={bot_id}, bot_self_id={bot_self_id}"
         )
@@ -132,17 +203,58 @@ class RoverSubscribe(BaseModel, table=True):
             return False
 
     @classmethod
-    @with_session
     async def get_group_bot(
         cls: Type[T_RoverSubscribe],
-        session: AsyncSession,
         group_id: str,
     ) -> Optional[str]:
-        """获取群组当前的bot_self_id"""
-        sql = select(cls).where(cls.group_id == group_id)
-        result = await session.execute(sql)
-        record = result.scalars().first()
-        return record.bot_self_id if record else None
+        """获取群组当前的bot_self_id（读取内存映射）"""
+        await cls.load_group_bot_cache()
+        cached = _group_bot_cache.get(group_id)
+        return cached[1] if cached else None
+
+    @classmethod
+    async def get_group_bots(
+        cls: Type[T_RoverSubscribe],
+        group_ids: Iterable[str],
+    ) -> Dict[str, str]:
+        """批量获取群组当前的bot_self_id
+
+        优先读取内存映射，未命中的群用一次 IN 查询补齐
+        """
+        await cls.load_group_bot_cache()
+        result: Dict[str, str] = {}
+        missing: List[str] = []
+        for group_id in dict.fromkeys(group_ids):
+            cached = _group_bot_cache.get(group_id)
+            if cached and cached[1]:
+                result[group_id] = cached[1]
+            else:
+                missing.append(group_id)
+        if missing:
+            for record in await cls._get_group_bot_records(missing):
+                if record.bot_self_id:
+                    result[record.group_id] = record.bot_self_id
+                    _group_bot_cache.setdefault(
+                        record.group_id,
+                        (record.bot_id, record.bot_self_id, record.updated_at or 0),
+                    )
+        return result
+
+    @classmethod
+    @with_session
+    async def _get_group_bot_records(
+        cls: Type[T_RoverSubscribe],
+        session: AsyncSession,
+        group_ids: List[str],
+    ) -> List[T_RoverSubscribe]:
+        records = []
+        for i in range(0, len(group_ids), IN_QUERY_CHUNK):
+            sql = select(cls).where(
+                col(cls.group_id).in_(group_ids[i : i + IN_QUERY_CHUNK])
+            )
+            result = await session.execute(sql)
+            records.extend(result.scalars().all())
+        return records
 
 
 class WavesSubscribeReader(BaseModel, table=True):
@@ -170,3 +282,23 @@ class WavesSubscribeReader(BaseModel, table=True):
         result = await session.execute(sql)
         record = result.scalars().first()
         return record.bot_self_id if record else None
+
+    @classmethod
+    @with_session
+    async def get_group_bots(
+        cls: Type[T_WavesSubscribeReader],
+        session: AsyncSession,
+        group_ids: Iterable[str],
+    ) -> Dict[str, str]:
+        """批量获取群组当前的bot_self_id"""
+        group_ids = list(dict.fromkeys(group_ids))
+        bots: Dict[str, str] = {}
+        for i in range(0, len(group_ids), IN_QUERY_CHUNK):
+            sql = select(cls.group_id, cls.bot_self_id).where(
+                col(cls.group_id).in_(group_ids[i : i + IN_QUERY_CHUNK])
+            )
+            result = await session.execute(sql)
+            for group_id, bot_self_id in result.all():
+                if bot_self_id:
+                    bots[group_id] = bot_self_id
+        return bots
@@ -1,15 +1,39 @@
-from typing import Any, Dict, Optional, Type, TypeVar
+from typing import List, Optional, Tuple, Type, TypeVar
 
 from sqlmodel import Field, select
-from sqlalchemy import update
+from sqlalchemy import UniqueConstraint, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from gsuid_core.logger import logger
+from gsuid_core.utils.database.startup import exec_list
 from gsuid_core.utils.database.base_models import BaseBotIDModel, with_session
 
 from ._lock import with_lock
 
+exec_list.extend(
+    [
+        # (user_id, bot_id, bot_self_id) 唯一：保留最新活跃时间到 id 最大的一行，再删除其余行
+        "UPDATE RoverUserActivity SET last_active_time = "
+        "(SELECT MAX(r.last_active_time) FROM RoverUserActivity r "
+        "WHERE r.user_id = RoverUserActivity.user_id "
+        "AND r.bot_id = RoverUserActivity.bot_id "
+        "AND r.bot_self_id = RoverUserActivity.bot_self_id) "
+        "WHERE id IN (SELECT MAX(id) FROM RoverUserActivity "
+        "GROUP BY user_id, bot_id, bot_self_id HAVING COUNT(*) > 1)",
+        "DELETE FROM RoverUserActivity WHERE id NOT IN "
+        "(SELECT MAX(id) FROM RoverUserActivity GROUP BY user_id, bot_id, bot_self_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_RoverUserActivity_user_bot "
+        "ON RoverUserActivity (user_id, bot_id, bot_self_id)",
+        "CREATE INDEX IF NOT EXISTS ix_RoverUserActivity_last_active_time "
+        "ON RoverUserActivity (last_active_time)",
+    ]
+)
+
+# 单条 INSERT 的行数上限（4 列 × 200 行，低于旧版 SQLite 999 个参数的限制）
+BULK_CHUNK_SIZE = 200
+
 T_RoverUserActivity = TypeVar("T_RoverUserActivity", bound="RoverUserActivity")
 
 
@@ -21,7 +45,13 @@ class RoverUserActivity(BaseBotIDModel, table=True):
     """
 
     __tablename__ = "RoverUserActivity"
-    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    # upsert 依赖 (user_id, bot_id, bot_self_id) 唯一约束：新库由 create_all 建立，旧库由 exec_list 去重后补建索引
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "bot_id", "bot_self_id", name="uq_RoverUserActivity_user_bot"
+        ),
+        {"extend_existing": True},
+    )
 
     user_id: str = Field(default="", title="用户ID")
     bot_self_id: str = Field(default="", title="机器人自身ID")
@@ -81,6 +111,62 @@ class RoverUserActivity(BaseBotIDModel, table=True):
 
         return True
 
+    @classmethod
+    async def bulk_update_user_activity(
+        cls: Type[T_RoverUserActivity],
+        entries: List[Tuple[str, str, str, int]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> int:
+        """批量更新用户活跃时间（带数据库错误保护）
+
+        Args:
+            entries: (user_id, bot_id, bot_self_id, last_active_time) 列表
+            chunk_size: 每条 INSERT 语句包含的行数
+
+        Returns:
+            int: 写入的行数
+        """
+        if not entries:
+            return 0
+        try:
+            return await cls._do_bulk_update_user_activity(entries, chunk_size)
+        except Exception as e:
+            if "malformed" in str(e) or "corrupt" in str(e):
+                logger.warning(f"[库洛签到·用户活跃度] 数据库损坏，跳过批量活跃度更新: {e}")
+                return 0
+            raise
+
+    @classmethod
+    @with_lock
+    @with_session
+    async def _do_bulk_update_user_activity(
+        cls: Type[T_RoverUserActivity],
+        session: AsyncSession,
+        entries: List[Tuple[str, str, str, int]],
+        chunk_size: int,
+    ) -> int:
+        # 同一事务内分块执行 INSERT ... ON CONFLICT DO UPDATE
+        for i in range(0, len(entries), chunk_size):
+            stmt = sqlite_insert(cls).values(
+                [
+                    {
+                        "user_id": user_id,
+                        "bot_id": bot_id,
+                        "bot_self_id": bot_self_id,
+                        "last_active_time": last_active_time,
+                    }
+                    for user_id, bot_id, bot_self_id, last_active_time in entries[
+                        i : i + chunk_size
+                    ]
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "bot_id", "bot_self_id"],
+                set_={"last_active_time": stmt.excluded.last_active_time},
+            )
+            await session.execute(stmt)
+        return len(entries)
+
     @classmethod
     async def get_user_last_active_time(
         cls: Type[T_RoverUserActivity],
@@ -143,16 +229,19 @@ class RoverUserActivity(BaseBotIDModel, table=True):
         current_time = int(time.time())
         threshold_time = current_time - (active_days * 24 * 60 * 60)
 
-        sql = select(cls).where(
-            and_(
-                cls.last_active_time.is_not(None),
-                cls.last_active_time >= threshold_time,
+        sql = (
+            select(func.count())
+            .select_from(cls)
+            .where(
+                and_(
+                    cls.last_active_time.is_not(None),
+                    cls.last_active_time >= threshold_time,
+                )
             )
         )
 
         result = await session.execute(sql)
-        data = result.scalars().all()
-        return len(data)
+        return result.scalar_one()
 
     @classmethod
     @with_session
@@ -0,0 +1,169 @@
+"""
+签到数据写入合并缓冲区
+
+签到任务执行期间，同一账号会多次写入 RoverSign（鸣潮签到、战双签到、社区任务进度），
+每次都单独开启 session 并提交事务。这里把待写入的数据按 (uid, date) 合并，
+每隔一小段时间或积攒到一定条数后，在同一个事务内批量落库。
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
+
+# 参与合并的字段（与 RoverSignData 一致）
+_MERGE_FIELDS = (
+    "pgr_uid",
+    "game_sign",
+    "pgr_game_sign",
+    "bbs_sign",
+    "bbs_detail",
+    "bbs_like",
+    "bbs_share",
+)
+
+
+class RoverSignWriteBuffer:
+    """RoverSign 写入合并缓冲区"""
+
+    def __init__(self, flush_interval: float = 0.3, max_pending: int = 200):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # 正在写库的数据，写完之前读取仍需可见
+        self._inflight: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._active = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        # 统计信息
+        self.rows_written = 0
+        self.commits = 0
+        self.flush_seconds = 0.0
+
+    @property
+    def active(self) -> bool:
+        """是否处于签到任务的缓冲模式"""
+        return self._active > 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def put(self, rover_sign_data):
+        """合并一条待写入的签到数据（新值覆盖旧值，空值不覆盖）"""
+        key = (rover_sign_data.uid, rover_sign_data.date)
+        pending = self._pending.setdefault(
+            key, {"uid": rover_sign_data.uid, "date": rover_sign_data.date}
+        )
+        for field in _MERGE_FIELDS:
+            value = getattr(rover_sign_data, field, None)
+            if value is not None and (field != "pgr_uid" or value):
+                pending[field] = value
+
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def overlay(self, model, uid: str, date: str, record):
+        """把缓冲区中尚未落库的状态叠加到查询结果上"""
+        key = (uid, date)
+        layers = [d for d in (self._inflight.get(key), self._pending.get(key)) if d]
+        if not layers:
+            return record
+        if record is None:
+            record = model(uid=uid, date=date)
+        for layer in layers:
+            for field, value in layer.items():
+                setattr(record, field, value)
+        return record
+
+    async def flush(self):
+        """把当前缓冲区内容在一个事务内写入数据库"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending = self._pending
+            self._pending = {}
+            self._inflight = pending
+
+            from .models import RoverSignData, RoverSign
+
+            start = time.perf_counter()
+            try:
+                await RoverSign.batch_upsert_rover_sign(
+                    [RoverSignData(**data) for data in pending.values()]
+                )
+            except Exception as e:
+                logger.warning(f"[库洛签到·写入缓冲] 批量写入失败，{len(pending)} 条数据放回缓冲区: {e}")
+                # 失败的数据放回，期间新写入的值优先
+                for key, data in pending.items():
+                    newer = self._pending.get(key)
+                    if newer:
+                        data.update(newer)
+                    self._pending[key] = data
+                return
+            finally:
+                self._inflight = {}
+
+            self.flush_seconds += time.perf_counter() - start
+            self.rows_written += len(pending)
+            self.commits += 1
+
+    async def _flush_loop(self):
+        while self.active:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"[库洛签到·写入缓冲] 刷写循环异常: {e}")
+
+    @asynccontextmanager
+    async def batching(self):
+        """签到任务期间开启写入缓冲，退出时强制刷写"""
+        self._active += 1
+        if self._flush_task is None or self._flush_task.done():
+            self.rows_written = 0
+            self.commits = 0
+            self.flush_seconds = 0.0
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self._active -= 1
+            if not self.active:
+                self._wakeup.set()
+                await self.close()
+                elapsed = time.perf_counter() - start
+                logger.info(
+                    f"[库洛签到·写入缓冲] 本轮签到写入 {self.rows_written} 条，"
+                    f"提交 {self.commits} 次，写库耗时 {self.flush_seconds:.2f}s，"
+                    f"平均 {self.commits / elapsed if elapsed else 0:.2f} 次提交/秒"
+                )
+
+    async def close(self):
+        """停止刷写循环并写入剩余数据"""
+        task = self._flush_task
+        if task and not task.done() and not self.active:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(task, timeout=5)
+            except asyncio.TimeoutError:
+                task.cancel()
+        await self.flush()
+
+
+sign_write_buffer = RoverSignWriteBuffer()
+
+
+@on_core_shutdown
+async def _flush_sign_buffer_on_shutdown():
+    if sign_write_buffer.pending_count:
+        logger.info(f"[库洛签到·写入缓冲] 退出前刷写 {sign_write_buffer.pending_count} 条签到数据...")
+    await sign_write_buffer.close()
@@ -0,0 +1,142 @@
+"""
+今日签到状态内存镜像
+
+进程内保存今日每个 UID 的签到完成情况（鸣潮、战双、社区任务），
+启动和跨日时从数据库加载，之后每次 upsert_rover_sign 同步更新，
+“是否已签到”的判断不再查询数据库。
+"""
+import asyncio
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from gsuid_core.logger import logger
+
+from ..util import get_today_date
+
+# 镜像中保存的字段顺序（与 RoverSign 一致）
+_STATE_FIELDS = (
+    "pgr_uid",
+    "game_sign",
+    "pgr_game_sign",
+    "bbs_sign",
+    "bbs_detail",
+    "bbs_like",
+    "bbs_share",
+)
+_EMPTY_STATE = (None, 0, 0, 0, 0, 0, 0)
+
+SignStateTuple = Tuple[Optional[str], int, int, int, int, int, int]
+
+
+@dataclass(slots=True)
+class SignState:
+    """镜像返回的签到状态，属性与 RoverSign 一致，可直接用于 SignStatus 判断"""
+
+    uid: str
+    date: str
+    pgr_uid: Optional[str] = None
+    game_sign: int = 0
+    pgr_game_sign: int = 0
+    bbs_sign: int = 0
+    bbs_detail: int = 0
+    bbs_like: int = 0
+    bbs_share: int = 0
+
+
+class TodaySignMirror:
+    """今日签到状态镜像"""
+
+    def __init__(self):
+        self._date = ""
+        self._states: Dict[str, SignStateTuple] = {}
+        self._lock = asyncio.Lock()
+        self._loading_date: Optional[str] = None
+        self._replay: List[Tuple[str, Dict[str, object]]] = []
+
+    @property
+    def date(self) -> str:
+        return self._date
+
+    def is_loaded(self, date: Optional[str] = None) -> bool:
+        return bool(self._date) and self._date == (date or get_today_date())
+
+    async def ensure_loaded(self) -> bool:
+        """确保镜像为今日数据（跨日自动重新加载），失败时返回 False 由调用方回退查库"""
+        if self.is_loaded():
+            return True
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"[库洛签到·状态镜像] 加载今日签到状态失败: {e}")
+            return False
+        return self.is_loaded()
+
+    async def load(self, date: Optional[str] = None):
+        """从数据库加载指定日期（默认今日）的签到状态"""
+        from .models import RoverSign
+
+        date = date or get_today_date()
+        async with self._lock:
+            if self.is_loaded(date):
+                return
+            self._loading_date = date
+            self._replay = []
+            try:
+                records = await RoverSign.get_all_sign_data_by_date(date)
+                states: Dict[str, SignStateTuple] = {
+                    record.uid: tuple(getattr(record, f) for f in _STATE_FIELDS)  # type: ignore
+                    for record in records
+                }
+                self._date = date
+                self._states = states
+                # 加载期间的写入重新合并，避免被数据库中的旧值覆盖
+                for uid, values in self._replay:
+                    self._merge(uid, values)
+            finally:
+                self._loading_date = None
+                self._replay = []
+        logger.info(f"[库洛签到·状态镜像] 已加载 {date} 签到状态 {len(self._states)} 条")
+
+    def _merge(self, uid: str, values: Dict[str, object]):
+        state = list(self._states.get(uid, _EMPTY_STATE))
+        for i, field in enumerate(_STATE_FIELDS):
+            if field in values:
+                state[i] = values[field]
+        self._states[uid] = tuple(state)  # type: ignore
+
+    def apply(self, rover_sign_data):
+        """同步一次签到数据写入（只合并非空字段）"""
+        values = {
+            field: getattr(rover_sign_data, field, None)
+            for field in _STATE_FIELDS
+            if getattr(rover_sign_data, field, None) is not None
+        }
+        if not values.get("pgr_uid", True):
+            values.pop("pgr_uid")
+        if rover_sign_data.date == self._loading_date:
+            self._replay.append((rover_sign_data.uid, values))
+        if rover_sign_data.date == self._date:
+            self._merge(rover_sign_data.uid, values)
+
+    def get(self, uid: str) -> Optional[SignState]:
+        """获取今日签到状态副本，没有记录返回 None"""
+        state = self._states.get(uid)
+        if state is None:
+            return None
+        return SignState(uid, self._date, *state)
+
+    def memory_usage(self) -> int:
+        """镜像占用的内存（字节，估算）"""
+        size = sys.getsizeof(self._states)
+        for uid, state in self._states.items():
+            size += sys.getsizeof(uid) + sys.getsizeof(state)
+            if state[0]:
+                size += sys.getsizeof(state[0])
+        return size
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+today_sign_mirror = TodaySignMirror()
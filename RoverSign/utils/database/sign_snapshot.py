@@ -0,0 +1,111 @@
+"""
+签到指令使用的账号快照
+
+一次 session 内查出用户的绑定、所有绑定 UID 的 WavesUser 记录以及今日签到状态
+（今日签到状态优先读取内存镜像），签到指令后续的判断都从快照读取，
+不再逐个 UID 查询数据库。
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Union, Optional
+
+from sqlmodel import col, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.utils.database.base_models import with_session
+
+from ..util import get_today_date
+from .models import RoverSign, WavesBind, WavesUser
+from .sign_buffer import sign_write_buffer
+from .sign_mirror import SignState, today_sign_mirror
+
+
+def _split_uid(uid: Optional[str]) -> List[str]:
+    return [u for u in uid.split("_") if u] if uid else []
+
+
+@dataclass(slots=True)
+class SignAccountSnapshot:
+    """用户所有绑定账号的签到快照"""
+
+    waves_uid_list: List[str] = field(default_factory=list)
+    pgr_uid_list: List[str] = field(default_factory=list)
+    # (uid, game_id) -> WavesUser
+    users: Dict[Tuple[str, int], WavesUser] = field(default_factory=dict)
+    # uid -> 今日签到记录
+    sign_data: Dict[str, Union[RoverSign, SignState]] = field(default_factory=dict)
+
+    def get_user(self, uid: str, game_id: Optional[int] = None) -> Optional[WavesUser]:
+        if game_id is not None:
+            return self.users.get((uid, game_id))
+        for (user_uid, _), user in self.users.items():
+            if user_uid == uid:
+                return user
+        return None
+
+    def get_hide_uid_pref(self, uid: str, game_id: Optional[int] = None) -> str:
+        """与 get_hide_uid_pref 一致：没绑定就回空 (走全局 HideUid)"""
+        user = self.get_user(uid, game_id)
+        return user.hide_uid_self_value if user else ""
+
+    def get_sign_data(self, uid: str) -> Optional[Union[RoverSign, SignState]]:
+        return self.sign_data.get(uid)
+
+
+class SignSnapshotLoader:
+    @classmethod
+    @with_session
+    async def load(
+        cls,
+        session: AsyncSession,
+        user_id: str,
+        bot_id: str,
+    ) -> Optional[SignAccountSnapshot]:
+        """加载用户的签到快照，未绑定时返回 None"""
+        result = await session.execute(
+            select(WavesBind).where(
+                WavesBind.user_id == user_id,
+                WavesBind.bot_id == bot_id,
+            )
+        )
+        bind_data = result.scalars().first()
+        if not bind_data:
+            return None
+
+        snapshot = SignAccountSnapshot(
+            waves_uid_list=_split_uid(bind_data.uid),
+            pgr_uid_list=_split_uid(bind_data.pgr_uid),
+        )
+        uids = list(dict.fromkeys([*snapshot.waves_uid_list, *snapshot.pgr_uid_list]))
+        if not uids:
+            return snapshot
+
+        result = await session.execute(
+            select(WavesUser).where(
+                WavesUser.user_id == user_id,
+                WavesUser.bot_id == bot_id,
+                col(WavesUser.uid).in_(uids),
+            )
+        )
+        for user in result.scalars().all():
+            # 与 select_waves_user 一致，同一 (uid, game_id) 取第一条
+            snapshot.users.setdefault((user.uid, user.game_id), user)
+
+        if await today_sign_mirror.ensure_loaded():
+            for uid in uids:
+                if state := today_sign_mirror.get(uid):
+                    snapshot.sign_data[uid] = state
+            return snapshot
+
+        today = get_today_date()
+        result = await session.execute(
+            select(RoverSign).where(
+                col(RoverSign.uid).in_(uids),
+                RoverSign.date == today,
+            )
+        )
+        records = {record.uid: record for record in result.scalars().all()}
+        for uid in uids:
+            record = sign_write_buffer.overlay(RoverSign, uid, today, records.get(uid))
+            if record is not None:
+                snapshot.sign_data[uid] = record
+        return snapshot
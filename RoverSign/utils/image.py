@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import Literal
 
@@ -9,8 +10,20 @@ ICON = Path(__file__).parent.parent.parent / "ICON.png"
 TEXT_PATH = Path(__file__).parent / "texture2d"
 
 
+@lru_cache(maxsize=32)
+def _load_asset(path: Path) -> Image.Image:
+    img = Image.open(path)
+    img.load()
+    return img
+
+
+def load_image_asset(path: Path) -> Image.Image:
+    """读取图片素材（解码结果进程内共享，返回副本供调用方修改）"""
+    return _load_asset(Path(path)).copy()
+
+
 def get_ICON():
-    return Image.open(ICON)
+    return load_image_asset(ICON)
 
 
 def get_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
@@ -31,7 +44,7 @@ def get_crop_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
 
 
 def get_footer(color: Literal["white", "black", "hakush"] = "white"):
-    return Image.open(TEXT_PATH / f"footer_{color}.png")
+    return load_image_asset(TEXT_PATH / f"footer_{color}.png")
 
 
 def add_footer(
@@ -1,25 +1,52 @@
 import inspect
+from contextvars import ContextVar
+from functools import wraps
 from typing import Optional
 
 from gsuid_core.logger import logger
 
+ROVER_PLUGIN_NAME = "RoverSign"
 
-def is_from_plugin(plugin_name: str = "RoverSign") -> bool:
-    """检查当前调用是否来自指定插件"""
-    current_plugin = get_current_plugin()
-    result = current_plugin == plugin_name
+# 当前正在执行的插件，由插件 SV handler 入口设置，
+# 同一事件处理链路（包括其中创建的子任务）都能读到
+current_plugin: ContextVar[Optional[str]] = ContextVar(
+    "rover_current_plugin", default=None
+)
 
-    if result:
-        logger.debug(f"[库洛签到·插件检查] 调用来自插件 {plugin_name}")
 
-    return result
+def rover_plugin_handler(func):
+    """标记 RoverSign SV handler，执行期间 is_from_rover_plugin() 为真
+
+    需放在 SV 装饰器下方（先包装再注册）。
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_plugin.set(ROVER_PLUGIN_NAME)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_plugin.reset(token)
+
+    return wrapper
+
+
+def is_from_plugin(plugin_name: str = ROVER_PLUGIN_NAME) -> bool:
+    """检查当前调用是否来自指定插件（O(1)，读取 contextvar）"""
+    return current_plugin.get() == plugin_name
 
 
 def get_current_plugin() -> Optional[str]:
     """获取当前执行的插件名称
+
+    优先读取 contextvar；未设置时回退为遍历调用栈（开销较大，仅供兼容）
     Returns:
         Optional[str]: 插件名称，如果不在插件中则返回 None
     """
+    plugin_name = current_plugin.get()
+    if plugin_name:
+        return plugin_name
+
     frame = inspect.currentframe()
 
     # 需要跳过的工具文件
@@ -30,25 +57,19 @@ def get_current_plugin() -> Optional[str]:
         frame = frame.f_back
 
         while frame:
-            frame_info = inspect.getframeinfo(frame)
-            file_path = frame_info.filename
+            # 直接读取 co_filename，避免 inspect.getframeinfo 读取源码行
+            file_path = frame.f_code.co_filename
 
             # 检查是否在 plugins 目录中
-            if "/plugins/" in file_path:
-                parts = file_path.split("/plugins/")
-                if len(parts) >= 2:
-                    plugin_path = parts[1]
-                    plugin_name = plugin_path.split("/")[0]
+            for sep in ("/", "\\"):
+                marker = f"{sep}plugins{sep}"
+                if marker in file_path:
+                    plugin_path = file_path.split(marker, 1)[1]
+                    plugin_name = plugin_path.split(sep)[0]
                     # 只记录非工具文件的插件
                     if not any(skip_file in file_path for skip_file in skip_files):
                         all_plugins.append(plugin_name)
-            elif "\\plugins\\" in file_path:
-                parts = file_path.split("\\plugins\\")
-                if len(parts) >= 2:
-                    plugin_path = parts[1]
-                    plugin_name = plugin_path.split("\\")[0]
-                    if not any(skip_file in file_path for skip_file in skip_files):
-                        all_plugins.append(plugin_name)
+                    break
 
             frame = frame.f_back
 
@@ -65,4 +86,4 @@ def get_current_plugin() -> Optional[str]:
 
 def is_from_rover_plugin() -> bool:
     """快捷方法：检查是否来自 RoverSign 插件"""
-    return is_from_plugin("RoverSign")
+    return is_from_plugin(ROVER_PLUGIN_NAME)
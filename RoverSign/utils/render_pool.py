@@ -0,0 +1,199 @@
+"""
+图片渲染线程池
+
+PIL 绘图与字体栅格化是同步操作，放在事件循环里会阻塞其他指令与插件。
+这里把签到报告的渲染、帮助图的重新编码提交到有上限的线程池，直接返回编码后的字节，
+并提供事件循环延迟监测，用于观察推送期间的阻塞情况。
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Callable, Hashable, Optional, Tuple, TypeVar
+
+from PIL import Image
+
+from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
+
+# 渲染线程数（同时也是并发渲染上限）
+RENDER_WORKERS = 4
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=RENDER_WORKERS, thread_name_prefix="RoverSignRender"
+        )
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(RENDER_WORKERS)
+    return _semaphore
+
+
+def get_encode_options() -> Tuple[str, int]:
+    from ..roversign_config.roversign_config import RoverSignConfig
+
+    fmt = RoverSignConfig.get_config("ImageEncodeFormat").data
+    quality = RoverSignConfig.get_config("ImageEncodeQuality").data
+    return fmt, min(max(int(quality), 1), 100)
+
+
+def encode_image(
+    img: Image.Image,
+    fmt: Optional[str] = None,
+    quality: Optional[int] = None,
+    allow_palette: bool = True,
+) -> bytes:
+    """按配置的格式编码图片
+
+    - png: 无损 PNG
+    - png_palette: 量化为 256 色调色板的 PNG（渐变 + 文字的报告图体积大幅减小）；
+      allow_palette=False 时（如带照片背景的帮助图）改为无损 PNG
+    - webp / jpeg: 有损压缩，使用配置的质量
+    """
+    if fmt is None or quality is None:
+        conf_fmt, conf_quality = get_encode_options()
+        fmt = fmt or conf_fmt
+        quality = quality or conf_quality
+
+    buffer = BytesIO()
+    if fmt == "png_palette" and not allow_palette:
+        img.save(buffer, format="PNG", optimize=True)
+    elif fmt == "png_palette":
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGBA").quantize(256, method=Image.FASTOCTREE)
+        else:
+            img = img.quantize(256)
+        img.save(buffer, format="PNG", optimize=True)
+    elif fmt == "webp":
+        img.save(buffer, format="WEBP", quality=quality, method=4)
+    elif fmt == "jpeg":
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# 编码结果缓存：内容键 -> 字节（内容相同的图片只绘制、编码一次）
+_ENCODED_CACHE_SIZE = 64
+_encoded_cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+encode_stats = {"hits": 0, "misses": 0, "bytes": 0}
+
+
+def _cache_get(key: Hashable) -> Optional[bytes]:
+    data = _encoded_cache.get(key)
+    if data is not None:
+        _encoded_cache.move_to_end(key)
+        encode_stats["hits"] += 1
+    return data
+
+
+def _cache_put(key: Hashable, data: bytes):
+    _encoded_cache[key] = data
+    _encoded_cache.move_to_end(key)
+    while len(_encoded_cache) > _ENCODED_CACHE_SIZE:
+        _encoded_cache.popitem(last=False)
+
+
+def get_encode_stats_summary() -> str:
+    """编码缓存命中情况与已编码字节数，用于状态页"""
+    hits, misses = encode_stats["hits"], encode_stats["misses"]
+    total = hits + misses
+    rate = hits / total * 100 if total else 0.0
+    return (
+        f"命中 {hits}/{total}（{rate:.0f}%），"
+        f"已编码 {encode_stats['bytes'] / 1024:.1f}KB"
+    )
+
+
+async def run_in_render_pool(func: Callable[..., T], *args: Any) -> T:
+    """在渲染线程池中执行同步函数"""
+    async with _get_semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+async def render_image(
+    func: Callable[..., Image.Image],
+    *args: Any,
+    cache_key: Optional[Hashable] = None,
+) -> bytes:
+    """在渲染线程池中绘制图片并编码，返回字节
+
+    cache_key 为图片内容键（如标题文本 + 主题），相同内容直接复用已编码的字节
+    """
+    options = get_encode_options()
+    key = (cache_key, *options) if cache_key is not None else None
+    if key is not None and (cached := _cache_get(key)) is not None:
+        return cached
+
+    def _render() -> bytes:
+        return encode_image(func(*args), *options)
+
+    data = await run_in_render_pool(_render)
+    encode_stats["misses"] += 1
+    encode_stats["bytes"] += len(data)
+    if key is not None:
+        _cache_put(key, data)
+    return data
+
+
+@on_core_shutdown
+async def shutdown_render_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+class EventLoopLagMonitor:
+    """事件循环延迟监测：定时唤醒，统计实际唤醒时间的延后量"""
+
+    def __init__(self, name: str, interval: float = 0.05):
+        self.name = name
+        self.interval = interval
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+            self.samples += 1
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        avg = self.total_lag / self.samples if self.samples else 0.0
+        logger.info(
+            f"[库洛签到·渲染] {self.name} 事件循环延迟：平均 {avg * 1000:.1f}ms，"
+            f"最大 {self.max_lag * 1000:.1f}ms（采样 {self.samples} 次）"
+        )
+        return False
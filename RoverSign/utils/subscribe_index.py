@@ -0,0 +1,70 @@
+"""
+订阅索引
+
+推送时按 (user_id, bot_id) 与群号查找订阅，原来每条消息都线性遍历全部 Subscribe。
+这里每种订阅只加载一次并建立字典索引，同一次推送的各批消息与签到结果通知共用，
+订阅写入后主动失效。
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+from gsuid_core.subscribe import gs_subscribe
+from gsuid_core.utils.database.models import Subscribe
+
+# 索引最长复用时间（秒），开关订阅时会主动失效
+INDEX_TTL = 60
+
+UserKey = Tuple[str, str]
+
+
+class SubscribeIndex:
+    """单个订阅类型的索引"""
+
+    def __init__(self, task_name: str, subs: Optional[List[Subscribe]]):
+        self.task_name = task_name
+        self.subs: List[Subscribe] = list(subs or [])
+        self.loaded_at = time.monotonic()
+        # (user_id, bot_id) -> 私聊订阅
+        self.direct: Dict[UserKey, Subscribe] = {}
+        # (user_id, bot_id) -> 订阅（不区分私聊 / 群）
+        self.by_user: Dict[UserKey, Subscribe] = {}
+        # group_id -> 订阅列表
+        self.by_group: Dict[str, List[Subscribe]] = {}
+        for sub in self.subs:
+            key = (sub.user_id, sub.bot_id)
+            self.by_user.setdefault(key, sub)
+            if sub.user_type == "direct":
+                self.direct.setdefault(key, sub)
+            elif sub.group_id:
+                self.by_group.setdefault(sub.group_id, []).append(sub)
+
+    def __len__(self) -> int:
+        return len(self.subs)
+
+    def get_private_bot_self_id(self, user_id: str, bot_id: str) -> str:
+        """获取私聊订阅的 bot_self_id，没有订阅返回空字符串"""
+        sub = self.direct.get((user_id, bot_id))
+        return sub.bot_self_id if sub else ""
+
+    def get_user_sub(self, user_id: str, bot_id: str) -> Optional[Subscribe]:
+        return self.by_user.get((user_id, bot_id))
+
+
+_indexes: Dict[str, SubscribeIndex] = {}
+
+
+async def get_subscribe_index(task_name: str) -> SubscribeIndex:
+    """获取订阅索引，过期或被 invalidate_subscribe_index 清除后重新加载"""
+    index = _indexes.get(task_name)
+    if index is None or time.monotonic() - index.loaded_at > INDEX_TTL:
+        index = SubscribeIndex(task_name, await gs_subscribe.get_subscribe(task_name))
+        _indexes[task_name] = index
+    return index
+
+
+def invalidate_subscribe_index(task_name: Optional[str] = None):
+    """订阅发生写入后调用，task_name 为空时清空全部索引"""
+    if task_name is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(task_name, None)